@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Benchmarks of route lookup, request and response validation and merge.
+
+Usage: python -m benchmarks.run [--endpoints 50] [--models 20] [--depth 3]
+                                [--json results.json] [--compare baseline.json]
+
+Reports operations per second and the peak memory allocated by one round
+of a benchmark.
+With ``--compare`` the exit status is 1 when any benchmark got slower than
+the baseline by more than ``--tolerance``, so it can gate CI.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import argparse
+import io
+import json
+import sys
+import timeit
+
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.stats import ValidationStats
+from benchmarks.synthetic import Workload
+
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """Register ``function(workload)``, returning ``(ops, call)``: ``call()``
+    is what gets timed and performs ``ops`` operations."""
+    BENCHMARKS.append(function)
+    return function
+
+
+def _each(function, values):
+    def call():
+        for value in values:
+            function(value)
+    return len(values), call
+
+
+@benchmark
+def build(workload):
+    def call():
+        SwaggerValidator(workload.spec)
+    return 1, call
+
+
+@benchmark
+def lookup(workload):
+    lookup = SwaggerValidator(workload.spec).lookup
+    return _each(lambda path: lookup.get(*path), workload.paths)
+
+
+@benchmark
+def lookup_cached(workload):
+    lookup = SwaggerValidator(workload.spec, route_cache_size=len(workload.paths)).lookup
+    return _each(lambda path: lookup.get(*path), workload.paths)
+
+
+@benchmark
+def validate_request(workload):
+    return _each(SwaggerValidator(workload.spec).validate_request, workload.requests)
+
+
+@benchmark
+def validate_request_invalid(workload):
+    return _each(SwaggerValidator(workload.spec).validate_request, workload.invalid_requests)
+
+
+@benchmark
+def validate_request_stats(workload):
+    return _each(SwaggerValidator(workload.spec, stats=ValidationStats()).validate_request, workload.requests)
+
+
+@benchmark
+def validate_response(workload):
+    return _each(SwaggerValidator(workload.spec).validate_response, workload.responses)
+
+
+@benchmark
+def validate_response_invalid(workload):
+    return _each(SwaggerValidator(workload.spec).validate_response, workload.invalid_responses)
+
+
+@benchmark
+def validate_requests_batch(workload):
+    validator = SwaggerValidator(workload.spec)
+
+    def call():
+        for _ in validator.validate_requests(workload.requests):
+            pass
+    return len(workload.requests), call
+
+
+@benchmark
+def merge(workload):
+    validator = SwaggerValidator(workload.spec)
+    state = validator.state
+    specs = workload.merge_specs(10)
+
+    def call():
+        # every round merges into the same snapshot
+        validator.state = state
+        for spec in specs:
+            validator.merge(spec)
+    return len(specs), call
+
+
+def measure(ops, call, repeat=5, min_time=0.2):
+    """Return the best operations per second out of ``repeat`` runs, each
+    calling ``call`` often enough to take at least ``min_time`` seconds."""
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_time / elapsed * 1.2))
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return ops * number / best
+
+
+def measure_memory(call):
+    """Return the peak of memory allocated during one round, in bytes."""
+    if tracemalloc is None or not hasattr(tracemalloc, 'reset_peak'):
+        return None
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start
+
+
+def run(workload, names=None, repeat=5, min_time=0.2, output=sys.stdout):
+    results = {}
+    print('%-28s %14s %16s' % ('benchmark', 'ops/sec', 'peak KiB'), file=output)
+    for function in BENCHMARKS:
+        name = function.__name__
+        if names and name not in names:
+            continue
+        ops, call = function(workload)
+        ops_per_sec = measure(ops, call, repeat, min_time)
+        peak = measure_memory(call)
+        results[name] = {'ops_per_sec': ops_per_sec, 'peak_bytes': peak}
+        print('%-28s %14.1f %16s' % (name, ops_per_sec, '-' if peak is None else '%.1f' % (peak / 1024)), file=output)
+    return results
+
+
+def regressions(results, baseline, tolerance):
+    """Return ``(name, ops_per_sec, baseline_ops_per_sec)`` of benchmarks
+    slower than the baseline by more than ``tolerance`` (a fraction)."""
+    slower = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        expected = baseline[name]['ops_per_sec']
+        if result['ops_per_sec'] < expected * (1 - tolerance):
+            slower.append((name, result['ops_per_sec'], expected))
+    return slower
+
+
+def main(argv=None, output=sys.stdout):
+    parser = argparse.ArgumentParser(description='Benchmark swagger_validator on a synthetic spec.')
+    parser.add_argument('--endpoints', type=int, default=50, help='number of resources, each has 3 operations')
+    parser.add_argument('--models', type=int, default=20, help='number of models')
+    parser.add_argument('--depth', type=int, default=3, help='nesting depth of payloads')
+    parser.add_argument('--array-size', type=int, default=10, help='length of arrays in payloads')
+    parser.add_argument('--count', type=int, default=200, help='number of payloads of each kind')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimal duration of a single run, in seconds')
+    parser.add_argument('--only', action='append', metavar='NAME', help='run only this benchmark, may be repeated')
+    parser.add_argument('--json', metavar='FILE', help='write the results to FILE')
+    parser.add_argument('--compare', metavar='FILE', help='fail on regressions against results written by --json')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown against the baseline, 0.2 is 20%%')
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.endpoints, args.models, args.depth, args.array_size, args.count, args.seed)
+    results = run(workload, args.only, args.repeat, args.min_time, output)
+
+    if args.json:
+        with io.open(args.json, 'w', encoding='utf-8') as fileobj:
+            fileobj.write(json.dumps(results, indent=2, sort_keys=True))
+
+    if args.compare:
+        with io.open(args.compare, encoding='utf-8') as fileobj:
+            baseline = json.load(fileobj)
+        slower = regressions(results, baseline, args.tolerance)
+        for name, ops_per_sec, expected in slower:
+            print('%s regressed: %.1f ops/sec, baseline %.1f ops/sec' % (name, ops_per_sec, expected), file=output)
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
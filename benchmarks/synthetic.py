@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Synthetic specs and payloads for the benchmarks.
+
+Everything is generated from a seed, so the same arguments always give the
+same spec and the same payloads.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import random
+
+
+KINDS = ['alpha', 'beta', 'gamma', 'delta']
+
+
+def model_name(index):
+    return 'Model%d' % index
+
+
+def make_model(index, last):
+    properties = {
+        'id': {'type': 'integer', 'minimum': 0},
+        'name': {'type': 'string'},
+        'kind': {'type': 'string', 'enum': KINDS},
+        'score': {'type': 'number', 'minimum': 0, 'maximum': 100},
+        'active': {'type': 'boolean'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    }
+    if index < last:
+        # models form chains, payloads nest as deep as asked for
+        properties['child'] = {'type': model_name(index + 1)}
+        properties['children'] = {'type': 'array', 'items': {'type': model_name(index + 1)}}
+    return {
+        'id': model_name(index),
+        'properties': properties,
+        'required': ['id', 'name'],
+    }
+
+
+def make_spec(endpoints=50, models=20, start=0):
+    """Return a spec with ``endpoints`` resources (two paths and three
+    operations each) and ``models`` models; ``start`` offsets all names, so
+    specs built with different offsets can be merged without conflicts."""
+    apis = []
+    for index in range(start, start + endpoints):
+        resource_model = model_name(start + (index - start) % models)
+        apis.append({
+            'path': '/resource%d/' % index,
+            'operations': [
+                {'method': 'GET', 'nickname': 'list%d' % index, 'type': 'array', 'items': {'type': resource_model}},
+            ],
+        })
+        apis.append({
+            'path': '/resource%d/{id}/' % index,
+            'operations': [
+                {'method': 'GET', 'nickname': 'get%d' % index, 'type': resource_model},
+                {
+                    'method': 'PUT',
+                    'nickname': 'put%d' % index,
+                    'type': resource_model,
+                    'parameters': [
+                        {'name': 'body', 'paramType': 'body', 'required': True, 'type': resource_model},
+                        {'name': 'X-REQUEST-ID', 'paramType': 'header', 'required': True, 'type': 'integer'},
+                        {'name': 'id', 'paramType': 'path', 'type': 'integer'},
+                        {'name': 'limit', 'paramType': 'query', 'type': 'integer', 'minimum': 1, 'maximum': 100},
+                        {'name': 'q', 'paramType': 'query', 'type': 'string'},
+                    ],
+                },
+            ],
+        })
+    last = start + models - 1
+    return {
+        'apis': apis,
+        'models': dict((model_name(index), make_model(index, last)) for index in range(start, last + 1)),
+    }
+
+
+def make_value(index, last, depth, array_size, rng):
+    """Return a valid instance of model ``index``, nested ``depth`` levels."""
+    value = {
+        'id': rng.randint(0, 10 ** 6),
+        'name': 'name%d' % rng.randint(0, 1000),
+        'kind': rng.choice(KINDS),
+        'score': rng.uniform(0, 100),
+        'active': rng.random() < 0.5,
+        'tags': ['tag%d' % rng.randint(0, 100) for _ in range(array_size)],
+    }
+    if depth > 0 and index < last:
+        value['child'] = make_value(index + 1, last, depth - 1, array_size, rng)
+        value['children'] = [make_value(index + 1, last, depth - 1, array_size, rng) for _ in range(min(array_size, 3))]
+    return value
+
+
+def spoil(value, rng):
+    """Introduce a single error somewhere in a valid model instance."""
+    while 'child' in value and rng.random() < 0.5:
+        value = value['child']
+    mistake = rng.randint(0, 4)
+    if mistake == 0:
+        del value['name']
+    elif mistake == 1:
+        value['undeclared'] = 1
+    elif mistake == 2:
+        value['score'] = 1000
+    elif mistake == 3:
+        value['kind'] = 'omega'
+    else:
+        value['tags'].append(1)
+
+
+class Workload(object):
+    """A synthetic spec with matching requests and responses.
+
+    ``requests`` and ``responses`` hold valid payloads, ``invalid_requests``
+    and ``invalid_responses`` payloads of the same shape with exactly one
+    error each, ``paths`` the ``(method, path)`` pairs of all of them.
+    """
+
+    def __init__(self, endpoints=50, models=20, depth=3, array_size=10, count=200, seed=0):
+        self.endpoints = endpoints
+        self.models = models
+        self.spec = make_spec(endpoints, models)
+
+        rng = random.Random(seed)
+        self.requests = []
+        self.responses = []
+        self.invalid_requests = []
+        self.invalid_responses = []
+        self.paths = []
+        for _ in range(count):
+            index = rng.randrange(endpoints)
+            model_index = index % models
+            path = '/resource%d/%d/' % (index, rng.randint(1, 10 ** 6))
+            self.paths.append(('PUT', path))
+
+            request = {
+                'method': 'PUT',
+                'path': path,
+                'headers': {'X-REQUEST-ID': str(rng.randint(1, 10 ** 6))},
+                'query': {'limit': str(rng.randint(1, 100))},
+                'body': make_value(model_index, models - 1, depth, array_size, rng),
+            }
+            self.requests.append(request)
+            invalid_request = dict(request, body=make_value(model_index, models - 1, depth, array_size, rng))
+            spoil(invalid_request['body'], rng)
+            self.invalid_requests.append(invalid_request)
+
+            response = {'method': 'GET', 'path': path, 'data': make_value(model_index, models - 1, depth, array_size, rng)}
+            self.responses.append(response)
+            invalid_response = dict(response, data=make_value(model_index, models - 1, depth, array_size, rng))
+            spoil(invalid_response['data'], rng)
+            self.invalid_responses.append(invalid_response)
+
+    def merge_specs(self, count, endpoints=1, models=1):
+        """Return ``count`` small specs, each adding new endpoints and models."""
+        return [
+            make_spec(endpoints, models, start=self.endpoints + self.models + index * max(endpoints, models))
+            for index in range(count)
+        ]
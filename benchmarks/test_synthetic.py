@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+
+
+from swagger_validator import SwaggerValidator
+from benchmarks.run import main, regressions
+from benchmarks.synthetic import Workload
+
+
+def test_workload():
+    workload = Workload(endpoints=5, models=3, depth=2, array_size=2, count=20)
+    validator = SwaggerValidator(workload.spec)
+
+    for request in workload.requests:
+        assert validator.validate_request(request) == []
+    for response in workload.responses:
+        assert validator.validate_response(response) == []
+    for request in workload.invalid_requests:
+        assert len(validator.validate_request(request)) == 1
+    for response in workload.invalid_responses:
+        assert len(validator.validate_response(response)) == 1
+
+    for spec in workload.merge_specs(3):
+        assert validator.merge(spec) == []
+
+
+def test_regressions():
+    baseline = {'a': {'ops_per_sec': 100.0}, 'b': {'ops_per_sec': 100.0}}
+    results = {'a': {'ops_per_sec': 85.0}, 'b': {'ops_per_sec': 75.0}, 'c': {'ops_per_sec': 1.0}}
+    assert regressions(results, baseline, 0.2) == [('b', 75.0, 100.0)]
+
+
+def test_main(tmpdir):
+    results = tmpdir.join('results.json')
+    argv = ['--endpoints', '3', '--models', '2', '--count', '5', '--repeat', '1', '--min-time', '0', '--only', 'lookup']
+    output = io.StringIO() if str is not bytes else io.BytesIO()
+    assert main(argv + ['--json', str(results)], output) == 0
+    assert list(json.loads(results.read())) == ['lookup']
+
+    results.write(json.dumps({'lookup': {'ops_per_sec': 1e12}}))
+    assert main(argv + ['--compare', str(results)], output) == 1
@@ -7,3 +7,4 @@ __version__ = '0.3.0'
 
 
 from swagger_validator.core import SwaggerValidator
+from swagger_validator.errors import ValidationError
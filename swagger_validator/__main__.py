@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import sys
+
+
+from swagger_validator.replay import main
+
+
+sys.exit(main())
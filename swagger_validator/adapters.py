@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Lazy request and response sources.
+
+Validation reads requests and responses as mappings: ``method``, ``path``,
+``query``, ``headers`` and the body (looked up by the name of the body
+parameter) of requests, ``method``, ``path``, ``data`` and ``raw_data`` of
+responses.  The adapters here are such mappings over framework objects:
+every field is computed on first access, so validation only pays for what
+the resolved operation declares, and the body is only read and parsed for
+operations with a body parameter.  Parsing errors are reported by
+validation as ``json_invalid``.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+
+
+try:
+    from urllib.parse import parse_qsl
+except ImportError:
+    from urlparse import parse_qsl
+
+
+from swagger_validator import five
+
+
+def parse_query(query_string):
+    # the last value of repeated parameters wins
+    return dict(parse_qsl(query_string, keep_blank_values=True))
+
+
+def is_json(content_type):
+    return 'json' in (content_type or '')
+
+
+class Headers(dict):
+    """Header values keyed by lower case names, looked up case insensitively."""
+
+    def __init__(self, items=()):
+        super(Headers, self).__init__((name.lower(), value) for name, value in items)
+
+    def __contains__(self, name):
+        return super(Headers, self).__contains__(name.lower())
+
+    def __getitem__(self, name):
+        return super(Headers, self).__getitem__(name.lower())
+
+    def get(self, name, default=None):
+        return super(Headers, self).get(name.lower(), default)
+
+
+class EnvironHeaders(five.Mapping):
+    """Case insensitive view of the headers of a WSGI environ."""
+
+    SPECIAL = ('CONTENT_TYPE', 'CONTENT_LENGTH')
+
+    def __init__(self, environ):
+        self.environ = environ
+
+    @classmethod
+    def _key(cls, name):
+        key = name.upper().replace('-', '_')
+        return key if key in cls.SPECIAL else 'HTTP_' + key
+
+    def __getitem__(self, name):
+        value = self.environ.get(self._key(name))
+        if value is None or value == '' and self._key(name) in self.SPECIAL:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for key in self.environ:
+            if key.startswith('HTTP_'):
+                yield key[5:].replace('_', '-')
+            elif key in self.SPECIAL and self.environ[key] != '':
+                yield key.replace('_', '-')
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class QueryArguments(five.Mapping):
+    """Read-only view of tornado's ``HTTPServerRequest.query_arguments``:
+    values are decoded on access and the last of repeated values wins."""
+
+    def __init__(self, query_arguments):
+        self.query_arguments = query_arguments
+
+    def __getitem__(self, name):
+        return self.query_arguments[name][-1].decode('utf-8', 'replace')
+
+    def __contains__(self, name):
+        return name in self.query_arguments
+
+    def __iter__(self):
+        return iter(self.query_arguments)
+
+    def __len__(self):
+        return len(self.query_arguments)
+
+
+class LazyMapping(five.Mapping):
+    """Mapping of ``FIELDS`` computed by the ``get_<field>`` methods on first
+    access, plus an optional body field."""
+
+    FIELDS = ()
+    # name of the parsed body and of its serialized bytes
+    BODY = None
+    RAW_BODY = None
+
+    def __init__(self):
+        self._values = {}
+
+    def _get(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            value = self._values[name] = getattr(self, 'get_' + name)()
+            return value
+
+    def has_body(self):
+        return bool(self._get(self.RAW_BODY))
+
+    def get_body(self):
+        # ValueError for malformed bodies, not memoized
+        return json.loads(self._get(self.RAW_BODY).decode('utf-8'))
+
+    def _body_key(self, key):
+        return key == self.BODY
+
+    def __getitem__(self, key):
+        if key in self.FIELDS or key == self.RAW_BODY:
+            return self._get(key)
+        if self._body_key(key) and self.has_body():
+            if self.BODY not in self._values:
+                self._values[self.BODY] = self.get_body()
+            return self._values[self.BODY]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return True
+        return (key == self.RAW_BODY or self._body_key(key)) and self.has_body()
+
+    def __iter__(self):
+        for key in self.FIELDS:
+            yield key
+        if self.has_body():
+            yield self.BODY
+            yield self.RAW_BODY
+
+    def __len__(self):
+        return len(self.FIELDS) + (2 if self.has_body() else 0)
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (type(self).__name__, self['method'], self['path'])
+
+
+class RequestAdapter(LazyMapping):
+    """Base of lazy requests, subclasses implement ``get_method``,
+    ``get_path``, ``get_query``, ``get_headers`` and ``get_raw_body`` (the
+    JSON body as bytes, empty if there is none)."""
+
+    FIELDS = ('method', 'path', 'query', 'headers')
+    BODY = 'body'
+    RAW_BODY = 'raw_body'
+
+    def _body_key(self, key):
+        # body parameters are looked up by their name
+        return key not in self.FIELDS and key != self.RAW_BODY
+
+
+class WSGIRequest(RequestAdapter):
+    """Request of a WSGI environ.  A read body is put back into ``wsgi.input``."""
+
+    def __init__(self, environ):
+        super(WSGIRequest, self).__init__()
+        self.environ = environ
+
+    def get_method(self):
+        return self.environ['REQUEST_METHOD'].upper()
+
+    def get_path(self):
+        return self.environ.get('PATH_INFO', '')
+
+    def get_query(self):
+        return parse_query(self.environ.get('QUERY_STRING', ''))
+
+    def get_headers(self):
+        return EnvironHeaders(self.environ)
+
+    def content_length(self):
+        """Length of the JSON body, 0 without one, None if the Content-Length
+        header is malformed."""
+        if not is_json(self.environ.get('CONTENT_TYPE')):
+            return 0
+        try:
+            length = int(self.environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def has_body(self):
+        # without reading it; a malformed length is reported as a body error
+        return self.content_length() != 0
+
+    def get_raw_body(self):
+        length = self.content_length()
+        if length is None:
+            raise ValueError('invalid Content-Length %r' % self.environ.get('CONTENT_LENGTH'))
+        if not length:
+            return b''
+        body = self.environ['wsgi.input'].read(length)
+        self.environ['wsgi.input'] = io.BytesIO(body)
+        return body
+
+
+class TornadoRequest(RequestAdapter):
+    """Request of a ``tornado.httputil.HTTPServerRequest``; headers and query
+    arguments are used as they are, not copied."""
+
+    def __init__(self, request):
+        super(TornadoRequest, self).__init__()
+        self.request = request
+
+    def get_method(self):
+        return self.request.method.upper()
+
+    def get_path(self):
+        return self.request.path
+
+    def get_query(self):
+        return QueryArguments(self.request.query_arguments)
+
+    def get_headers(self):
+        # HTTPHeaders is case insensitive already
+        return self.request.headers
+
+    def get_raw_body(self):
+        if not is_json(self.request.headers.get('Content-Type')):
+            return b''
+        return self.request.body
+
+
+class ASGIRequest(RequestAdapter):
+    """Request of an ASGI http scope and its body, read already."""
+
+    def __init__(self, scope, raw_body=b''):
+        super(ASGIRequest, self).__init__()
+        self.scope = scope
+        self.raw_body = raw_body
+
+    def get_method(self):
+        return self.scope['method'].upper()
+
+    def get_path(self):
+        return self.scope['path']
+
+    def get_query(self):
+        return parse_query(self.scope.get('query_string', b'').decode('latin-1'))
+
+    def get_headers(self):
+        return Headers((name.decode('latin-1'), value.decode('latin-1')) for name, value in self.scope.get('headers', []))
+
+    def get_raw_body(self):
+        if not is_json(self['headers'].get('content-type')):
+            return b''
+        return self.raw_body
+
+
+class RawResponse(LazyMapping):
+    """Response with a serialized JSON body, parsed only when validated."""
+
+    FIELDS = ('method', 'path')
+    BODY = 'data'
+    RAW_BODY = 'raw_data'
+
+    def __init__(self, method, path, raw_data):
+        super(RawResponse, self).__init__()
+        self._values.update(method=method, path=path, raw_data=raw_data)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import gc
+import hashlib
+import io
+import json
+import os
+import pickle
+import sys
+
+
+from swagger_validator import __version__
+from swagger_validator.core import SwaggerValidator
+
+
+# bump whenever the pickled layout of the validator changes
+ARTIFACT_FORMAT = 5
+
+
+class StaleArtifact(Exception):
+    pass
+
+
+def artifact_key(spec_data, options=None):
+    """Identify an artifact by the raw spec bytes, the validator options,
+    the library version and the Python version."""
+    hasher = hashlib.sha1(spec_data)
+    # runtime options are objects whose repr differs between processes
+    options = sorted(
+        (name, value) for name, value in (options or {}).items()
+        if name not in SwaggerValidator.RUNTIME_OPTIONS
+    )
+    hasher.update(repr(options).encode('utf-8'))
+    return {
+        'format': ARTIFACT_FORMAT,
+        'version': __version__,
+        'python': list(sys.version_info[:2]),
+        'spec': hasher.hexdigest(),
+    }
+
+
+def dump(validator, fileobj, key):
+    pickle.dump(key, fileobj, pickle.HIGHEST_PROTOCOL)
+    pickle.dump(validator, fileobj, pickle.HIGHEST_PROTOCOL)
+
+
+def load(fileobj, key=None):
+    """Load a validator written by ``dump``.
+
+    Raises ``StaleArtifact`` if ``key`` is given and does not match the one
+    the artifact was written with.  Artifacts are pickles, only load the
+    ones you wrote yourself.
+    """
+    stored_key = pickle.load(fileobj)
+    if key is not None and stored_key != key:
+        raise StaleArtifact(stored_key)
+
+    # the validator is a large graph of small objects, collecting garbage
+    # while they are created would dominate the load time
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return pickle.load(fileobj)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def save(validator, filename, key):
+    # write to a temporary file and rename, so concurrently starting
+    # workers never read a half written artifact
+    temporary = '%s.%d.tmp' % (filename, os.getpid())
+    try:
+        with io.open(temporary, 'wb') as fileobj:
+            dump(validator, fileobj, key)
+        getattr(os, 'replace', os.rename)(temporary, filename)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def load_validator(spec_filename, artifact_filename, **options):
+    """Return a ``SwaggerValidator`` for the JSON spec in ``spec_filename``.
+
+    The prepared validator is loaded from ``artifact_filename`` when that
+    was built from the same spec bytes, options and library version;
+    otherwise it is built from the spec and the artifact is rewritten.
+    ``options`` are passed on to ``SwaggerValidator``; the runtime ones
+    (``stats``, ``sampling``, ``result_cache``) are neither part of the key
+    nor stored, they are set on the returned validator.
+    """
+    runtime = dict((name, options.pop(name, None)) for name in SwaggerValidator.RUNTIME_OPTIONS)
+
+    with io.open(spec_filename, 'rb') as fileobj:
+        spec_data = fileobj.read()
+    key = artifact_key(spec_data, options)
+
+    validator = None
+    try:
+        with io.open(artifact_filename, 'rb') as fileobj:
+            validator = load(fileobj, key)
+    except Exception:
+        # missing, stale or unreadable - rebuilding is always safe
+        pass
+
+    if validator is None:
+        validator = SwaggerValidator(json.loads(spec_data.decode('utf-8')), **options)
+        try:
+            save(validator, artifact_filename, key)
+        except Exception:
+            # the artifact is only a cache
+            pass
+
+    for name, value in runtime.items():
+        setattr(validator, name, value)
+    return validator
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""ASGI counterpart of ``middleware.ValidationMiddleware`` (Python 3.5+)."""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+from swagger_validator.adapters import ASGIRequest, Headers, RawResponse, is_json
+from swagger_validator.middleware import BackgroundValidator
+
+
+def _headers(raw_headers):
+    return Headers((name.decode('latin-1'), value.decode('latin-1')) for name, value in raw_headers)
+
+
+def _replay(messages, receive):
+    # a receive callable returning ``messages`` first
+    messages = list(messages)
+
+    async def replayed():
+        if messages:
+            return messages.pop(0)
+        return await receive()
+    return replayed
+
+
+class ValidationMiddleware(object):
+    """ASGI middleware validating requests inline and responses in the background.
+
+    JSON request bodies are read before the application runs and replayed
+    to it.  Bodies larger than ``max_body_size`` are not validated, nor are
+    responses with a status outside of 2xx.
+    """
+
+    def __init__(self, app, validator, report=None, validate_requests=True, validate_responses=True,
+                 maxsize=1000, workers=1, max_body_size=1024 * 1024):
+        self.app = app
+        self.validator = validator
+        self.report = report
+        self.validate_requests = validate_requests
+        self.max_body_size = max_body_size
+        self.background = BackgroundValidator(validator, report, maxsize, workers) if validate_responses else None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        if self.validate_requests:
+            request, receive = await self.build_request(scope, receive)
+            if request is not None:
+                errors = self.validator.validate_request(request)
+                if self.report is not None:
+                    self.report('request', request, errors)
+
+        if self.background is not None:
+            send = self._capture(send, scope['method'].upper(), scope['path'])
+
+        await self.app(scope, receive, send)
+
+    async def build_request(self, scope, receive):
+        """Return the lazy request (None if its body is too large to be
+        validated) and the receive callable to pass on to the application."""
+        request = ASGIRequest(scope)
+        if not is_json(request['headers'].get('content-type')):
+            return request, receive
+
+        messages = []
+        size = 0
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message['type'] != 'http.request':
+                break
+            size += len(message.get('body', b''))
+            if size > self.max_body_size:
+                return None, _replay(messages, receive)
+            if not message.get('more_body', False):
+                break
+
+        request.raw_body = b''.join(message.get('body', b'') for message in messages if message['type'] == 'http.request')
+        return request, _replay(messages, receive)
+
+    def _capture(self, send, method, path):
+        # passes messages through, submitting JSON bodies of 2xx responses
+        chunks = None
+        size = 0
+
+        async def capture(message):
+            nonlocal chunks, size
+            if message['type'] == 'http.response.start':
+                content_type = _headers(message.get('headers', [])).get('content-type')
+                if 200 <= message['status'] < 300 and is_json(content_type):
+                    chunks = []
+            elif message['type'] == 'http.response.body' and chunks is not None:
+                body = message.get('body', b'')
+                size += len(body)
+                if size > self.max_body_size:
+                    chunks = None
+                else:
+                    chunks.append(body)
+                    if not message.get('more_body', False):
+                        self.background.submit(RawResponse(method, path, b''.join(chunks)))
+                        chunks = None
+            await send(message)
+        return capture
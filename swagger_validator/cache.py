@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+
+from swagger_validator import five
+
+
+# scalars told apart by their JSON
+JSON_SCALARS = five.string_types + five.integer_types + (float, bool, type(None))
+
+
+def _is_plain_json(value):
+    # dicts with string keys, lists and JSON scalars only: serializing
+    # other values (tuples, int keys, ...) loses what validation tells apart
+    if isinstance(value, dict):
+        return all(isinstance(key, five.string_types) and _is_plain_json(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_is_plain_json(item) for item in value)
+    return isinstance(value, JSON_SCALARS)
+
+
+class ErrorRecorder(object):
+    """Sink keeping the raw ``(code, node, msg)`` of every error, so they can
+    be replayed into another sink later."""
+
+    def __init__(self):
+        self.records = []
+
+    def add(self, code, node=None, msg=None):
+        self.records.append((code, node, msg))
+
+
+class ResultCache(object):
+    """Validation results of response payloads seen before.
+
+    Pass an instance as ``SwaggerValidator(spec, result_cache=...)``.
+    Entries are keyed by the operation and a digest of the payload: of
+    ``response['raw_data']`` (the serialized body, bytes) when present,
+    otherwise of the canonical JSON of ``response['data']``.  Data holding
+    anything else than JSON types (tuples, non-string keys, ...) is not
+    cached, its JSON would be the same as of data validated differently.
+    Least recently used entries are dropped when there are more than
+    ``maxsize`` of them or their estimated size exceeds ``maxbytes``.
+    """
+
+    # rough cost of an entry and of each error it holds, in bytes
+    ENTRY_SIZE = 256
+    ERROR_SIZE = 256
+
+    def __init__(self, maxsize=10000, maxbytes=16 * 1024 * 1024):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        # key -> (records, estimated size)
+        self.data = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'maxsize': self.maxsize, 'maxbytes': self.maxbytes}
+
+    def __setstate__(self, state):
+        self.__init__(state['maxsize'], state['maxbytes'])
+
+    def __len__(self):
+        return len(self.data)
+
+    @staticmethod
+    def digest(data, raw_data=None):
+        """Return the digest of a payload, or None if it cannot be cached."""
+        if raw_data is not None:
+            return b'r' + hashlib.sha1(raw_data).digest()
+        if not _is_plain_json(data):
+            return None
+        try:
+            serialized = json.dumps(data, sort_keys=True, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+        return b'j' + hashlib.sha1(serialized.encode('utf-8')).digest()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.data.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.data[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, records):
+        size = self.ENTRY_SIZE + sum(self.ERROR_SIZE + len(msg or '') for _, _, msg in records)
+        with self._lock:
+            previous = self.data.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self.data[key] = (records, size)
+            self.size += size
+            while self.data and (len(self.data) > self.maxsize or self.size > self.maxbytes):
+                _, (_, evicted_size) = self.data.popitem(last=False)
+                self.size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self.data.clear()
+            self.size = 0
+
+    def info(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self.data),
+            'maxsize': self.maxsize,
+            'bytes': self.size,
+            'maxbytes': self.maxbytes,
+        }
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+from swagger_validator import five
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+SIMPLE_TYPES = {
+    'boolean': (bool, ()),
+    'string': (five.string_types, ()),
+    'integer': (five.integer_types, bool),
+    'number': (five.integer_types + (float,), bool),
+    'array': (list, ()),
+}
+
+
+def describe(value):
+    # containers are named, as validate_response_stream never reads them whole
+    if isinstance(value, dict):
+        return 'object'
+    elif isinstance(value, list):
+        return 'array'
+    return repr(value)
+
+
+def prepend_path(errors, prefix):
+    for error in errors:
+        error['path'] = prefix + error.get('path', [])
+    return errors
+
+
+class TypeChecker(object):
+    """Checks a value against a simple (non model) type.
+
+    Everything that can be derived from the type spec is computed once in
+    the constructor, so calling the checker only touches the value.
+    Checkers report errors to ``sink`` (see ``errors.ErrorCollector``),
+    ``path`` is the parent-pointer path of the checked value.
+    """
+
+    def __init__(self, type_name, type_spec):
+        self.type_name = type_name
+        self.type_inc, self.type_exc = SIMPLE_TYPES[type_name]
+
+    def __call__(self, value, path, sink):
+        if not isinstance(value, self.type_inc) or isinstance(value, self.type_exc):
+            sink.add('type_invalid', path, 'expected %s got %r' % (self.type_name, value))
+        else:
+            self.check_constraints(value, path, sink)
+
+    def check_constraints(self, value, path, sink):
+        pass
+
+    def find_invalid(self, values):
+        """Return indexes of ``values`` that may be invalid (a superset of
+        the invalid ones) using bulk operations, or None when the values
+        have to be checked one by one."""
+        type_inc, type_exc = self.type_inc, self.type_exc
+        for value_type in set(map(type, values)):
+            if not issubclass(value_type, type_inc) or issubclass(value_type, type_exc):
+                return None
+        return self.find_invalid_constraints(values)
+
+    def find_invalid_constraints(self, values):
+        return ()
+
+
+class StringChecker(TypeChecker):
+    def __init__(self, type_name, type_spec):
+        super(StringChecker, self).__init__(type_name, type_spec)
+        self.enum = frozenset(type_spec['enum']) if 'enum' in type_spec else None
+
+    def check_constraints(self, value, path, sink):
+        if self.enum is not None and value not in self.enum:
+            sink.add('type_constraint', (path, 'enum'), 'expected integer got %r' % value)
+
+    def find_invalid_constraints(self, values):
+        if self.enum is None:
+            return ()
+        invalid = set(values) - self.enum
+        if not invalid:
+            return ()
+        return [index for index, value in enumerate(values) if value in invalid]
+
+
+class NumberChecker(TypeChecker):
+    def __init__(self, type_name, type_spec):
+        super(NumberChecker, self).__init__(type_name, type_spec)
+        self.minimum = float(type_spec['minimum']) if 'minimum' in type_spec else None
+        self.maximum = float(type_spec['maximum']) if 'maximum' in type_spec else None
+        # messages show the bounds as written in the spec
+        self.spec_minimum = type_spec.get('minimum')
+        self.spec_maximum = type_spec.get('maximum')
+
+    def check_constraints(self, value, path, sink):
+        if self.minimum is not None and value < self.minimum:
+            sink.add('type_constraint', (path, 'minimum'), 'expected not less than %r got %r' % (self.spec_minimum, value))
+
+        if self.maximum is not None and value > self.maximum:
+            sink.add('type_constraint', (path, 'maximum'), 'expected not more than %r got %r' % (self.spec_maximum, value))
+
+    # ints of this magnitude or more may not convert to float64 exactly
+    EXACT_FLOAT_LIMIT = 2 ** 53
+
+    def find_invalid_constraints(self, values):
+        if self.minimum is None and self.maximum is None:
+            return ()
+        if numpy is None:
+            return None
+
+        try:
+            array = numpy.asarray(values, dtype=numpy.float64)
+        except OverflowError:
+            return None
+        # 'number' arrays may hold ints as well
+        if numpy.abs(array).max() >= self.EXACT_FLOAT_LIMIT and any(isinstance(value, five.integer_types) for value in values):
+            return None
+
+        invalid = numpy.zeros(len(array), dtype=bool)
+        if self.minimum is not None:
+            invalid |= array < self.minimum
+        if self.maximum is not None:
+            invalid |= array > self.maximum
+        return numpy.flatnonzero(invalid).tolist()
+
+
+class ArrayChecker(TypeChecker):
+    # arrays of simple types at least this long are checked in bulk first
+    BULK_MIN_LENGTH = 64
+
+    def __init__(self, type_name, type_spec, models):
+        super(ArrayChecker, self).__init__(type_name, type_spec)
+        if 'items' in type_spec:
+            self.items = compile_type_or_model(type_spec['items'], models)
+        else:
+            self.items = None
+        self.bulk = self.items is not None and type(self.items) in (TypeChecker, StringChecker, NumberChecker)
+
+    def check_constraints(self, value, path, sink):
+        items = self.items
+        if items is None:
+            return
+
+        if self.bulk and len(value) >= self.BULK_MIN_LENGTH:
+            invalid = items.find_invalid(value)
+            if invalid is not None:
+                # only the suspicious items go through the regular checker,
+                # which builds the very same errors as the loop below
+                for item_index in invalid:
+                    items(value[item_index], (path, item_index), sink)
+                return
+
+        for item_index, item_value in enumerate(value):
+            items(item_value, (path, item_index), sink)
+
+
+class ModelReference(object):
+    """Late bound reference to a model, so models may refer to each other
+    (or to themselves) regardless of the order they were compiled in."""
+
+    def __init__(self, model_name, models):
+        self.model_name = model_name
+        self.models = models
+
+    def __call__(self, value, path, sink):
+        model = self.models.get(self.model_name)
+        if model is None:
+            sink.add('model_missing', (path, self.model_name))
+        else:
+            model(value, path, sink)
+
+
+class ModelChecker(object):
+    def __init__(self, model_name, model_spec, models):
+        self.model_name = model_name
+        # path segments are prebuilt, so reporting an error or descending
+        # into a property does not concatenate anything
+        self.required = tuple(
+            (property_name, (model_name, property_name))
+            for property_name in model_spec.get('required', [])
+        )
+        self.declared = frozenset(model_spec.get('properties', {}))
+        self.properties = tuple(
+            (property_name, (model_name, property_name), compile_type_or_model(property_spec, models))
+            for property_name, property_spec in sorted(model_spec.get('properties', {}).items())
+        )
+        self.properties_by_name = dict(
+            (property_name, (segment, property_checker))
+            for property_name, segment, property_checker in self.properties
+        )
+
+    def __call__(self, model_instance, path, sink):
+        if not isinstance(model_instance, dict):
+            sink.add('type_invalid', path, 'expected %s got %s' % (self.model_name, describe(model_instance)))
+            return
+
+        for required_property, segment in self.required:
+            if required_property not in model_instance:
+                sink.add('property_missing', (path, segment))
+
+        declared = self.declared
+        undeclared = [key for key in model_instance if key not in declared]
+        if undeclared:
+            model_name = self.model_name
+            for undeclared_property in sorted(undeclared):
+                sink.add('property_undeclared', (path, (model_name, undeclared_property)))
+
+        for property_name, segment, property_checker in self.properties:
+            if property_name in model_instance:
+                property_checker(model_instance[property_name], (path, segment), sink)
+
+
+TYPE_CHECKERS = {
+    'boolean': TypeChecker,
+    'string': StringChecker,
+    'integer': NumberChecker,
+    'number': NumberChecker,
+}
+
+
+def is_simple_type(type_spec):
+    return type_spec.get('type', 'string') in SIMPLE_TYPES
+
+
+def compile_type_or_model(type_spec, models):
+    type_name = type_spec.get('type', 'string')
+    if type_name == 'array':
+        return ArrayChecker(type_name, type_spec, models)
+    elif type_name in TYPE_CHECKERS:
+        return TYPE_CHECKERS[type_name](type_name, type_spec)
+    else:
+        return ModelReference(type_name, models)
+
+
+def model_references(checker):
+    """Names of the models ``checker`` refers to (not following them)."""
+    if isinstance(checker, ModelReference):
+        yield checker.model_name
+    elif isinstance(checker, ModelChecker):
+        for property_name, segment, property_checker in checker.properties:
+            for model_name in model_references(property_checker):
+                yield model_name
+    elif isinstance(checker, ArrayChecker) and checker.items is not None:
+        for model_name in model_references(checker.items):
+            yield model_name
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Generate a Python module validating requests and responses of a spec.
+
+Usage: python -m swagger_validator.codegen spec.json -o api_validators.py
+
+The generated module has one function per model and per operation with
+property names, enums and bounds inlined, and exposes ``validate_request``,
+``validate_response``, ``is_valid_request`` and ``is_valid_response`` with
+the same signatures and results as ``SwaggerValidator``.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import argparse
+import io
+import json
+import re
+import sys
+
+
+from swagger_validator.checkers import TypeChecker, StringChecker, NumberChecker, ArrayChecker, ModelReference
+from swagger_validator.core import SwaggerValidator, path_patterns
+
+
+HEADER = '''\
+# -*- coding: utf-8 -*-
+# Generated by swagger_validator.codegen, do not edit.
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+from swagger_validator import five
+from swagger_validator.checkers import describe
+from swagger_validator.core import OperationLookup
+from swagger_validator.errors import ErrorCollector, ErrorLimitReached, ValidityCheck
+
+
+_STRING_TYPES = five.string_types
+_INTEGER_TYPES = five.integer_types
+_NUMBER_TYPES = five.integer_types + (float,)
+'''
+
+
+FOOTER = '''\
+
+
+lookup = OperationLookup(APIS, ignore_endpoints=IGNORE_ENDPOINTS)
+
+
+def _validate_request(request, sink):
+    method = request['method'].upper()
+    path = request['path']
+    operation, path_parameters = lookup.get(method, path)
+
+    if operation is False:
+        return
+
+    if operation is None:
+        sink.add('operation_missing', (None, (method, path)))
+        return
+
+    operation['request'](request, method, path, path_parameters, sink)
+
+
+def _validate_response(response, sink):
+    method = response['method'].upper()
+    path = response['path']
+    operation, path_parameters = lookup.get(method, path)
+
+    if operation is False:
+        return
+
+    if operation is None:
+        sink.add('operation_missing', (None, (method, path)))
+        return
+
+    # skipping verification - by design
+    if 'data' not in response:
+        return
+
+    data_path = (None, (method, path, 'data'))
+    try:
+        data = response['data']
+    except ValueError as e:
+        sink.add('json_invalid', data_path, str(e))
+    else:
+        operation['response'](data, data_path, sink)
+
+
+def _collect(validate, value, max_errors, fail_fast):
+    sink = ErrorCollector(1 if fail_fast else max_errors)
+    try:
+        validate(value, sink)
+    except ErrorLimitReached:
+        pass
+    return sink.errors
+
+
+def _check(validate, value):
+    try:
+        validate(value, ValidityCheck())
+    except ErrorLimitReached:
+        return False
+    return True
+
+
+def validate_request(request, max_errors=None, fail_fast=False):
+    return _collect(_validate_request, request, max_errors, fail_fast)
+
+
+def validate_response(response, max_errors=None, fail_fast=False):
+    return _collect(_validate_response, response, max_errors, fail_fast)
+
+
+def is_valid_request(request):
+    return _check(_validate_request, request)
+
+
+def is_valid_response(response):
+    return _check(_validate_response, response)
+'''
+
+
+TYPE_TESTS = {
+    'boolean': 'isinstance(%(value)s, bool)',
+    'string': 'isinstance(%(value)s, _STRING_TYPES)',
+    'integer': 'isinstance(%(value)s, _INTEGER_TYPES) and not isinstance(%(value)s, bool)',
+    'number': 'isinstance(%(value)s, _NUMBER_TYPES) and not isinstance(%(value)s, bool)',
+    'array': 'isinstance(%(value)s, list)',
+}
+
+
+CONVERSIONS = {
+    'string': None,
+    'integer': 'int(%s, 10)',
+    'number': 'float(%s)',
+}
+
+
+def _identifier(name):
+    return re.sub(r'\W', '_', name)
+
+
+class CodeGenerator(object):
+    def __init__(self, validator, ignore_endpoints=()):
+        self.validator = validator
+        self.ignore_endpoints = ignore_endpoints
+        self.lines = []
+        self.constants = []
+        self.functions = {}
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line)
+
+    def constant(self, prefix, source):
+        name = '_%s_%d' % (prefix, len(self.constants))
+        self.constants.append('%s = %s' % (name, source))
+        return name
+
+    def function(self, prefix, name):
+        identifier = '%s_%s' % (prefix, _identifier(name))
+        while identifier in self.functions.values():
+            identifier += '_'
+        self.functions[prefix, name] = identifier
+        return identifier
+
+    def check(self, checker, value, path, indent, depth=0):
+        """Emit code checking the expression ``value`` (a plain name) against
+        ``checker``.  ``path`` is an expression evaluated only when needed."""
+        if isinstance(checker, ModelReference):
+            if checker.model_name in self.validator.models:
+                self.emit(indent, '%s(%s, %s, sink)' % (self.functions['model', checker.model_name], value, path))
+            else:
+                self.emit(indent, 'sink.add(%r, (%s, %r))' % ('model_missing', path, checker.model_name))
+            return
+
+        if not isinstance(checker, TypeChecker):
+            raise TypeError('unsupported checker %r' % checker)
+
+        type_test = TYPE_TESTS[checker.type_name] % {'value': value}
+        if ' and ' in type_test:
+            type_test = '(%s)' % type_test
+        self.emit(indent, 'if not %s:' % type_test)
+        self.emit(indent + 1, 'sink.add(%r, %s, %r %% (%s,))' % (
+            'type_invalid', path, 'expected %s got %%r' % checker.type_name, value,
+        ))
+
+        lines = len(self.lines)
+        self.emit(indent, 'else:')
+        if isinstance(checker, StringChecker) and checker.enum is not None:
+            enum = self.constant('ENUM', 'frozenset(%r)' % (sorted(checker.enum, key=repr),))
+            self.emit(indent + 1, 'if %s not in %s:' % (value, enum))
+            self.emit(indent + 2, 'sink.add(%r, (%s, %r), %r %% (%s,))' % (
+                'type_constraint', path, 'enum', 'expected integer got %r', value,
+            ))
+        elif isinstance(checker, NumberChecker):
+            if checker.minimum is not None:
+                self.emit(indent + 1, 'if %s < %r:' % (value, checker.minimum))
+                self.emit(indent + 2, 'sink.add(%r, (%s, %r), %r %% (%s,))' % (
+                    'type_constraint', path, 'minimum', 'expected not less than %r got %%r' % checker.spec_minimum, value,
+                ))
+            if checker.maximum is not None:
+                self.emit(indent + 1, 'if %s > %r:' % (value, checker.maximum))
+                self.emit(indent + 2, 'sink.add(%r, (%s, %r), %r %% (%s,))' % (
+                    'type_constraint', path, 'maximum', 'expected not more than %r got %%r' % checker.spec_maximum, value,
+                ))
+        elif isinstance(checker, ArrayChecker) and checker.items is not None:
+            index, item = 'index_%d' % depth, 'item_%d' % depth
+            self.emit(indent + 1, 'for %s, %s in enumerate(%s):' % (index, item, value))
+            self.check(checker.items, item, '(%s, %s)' % (path, index), indent + 2, depth + 1)
+
+        if len(self.lines) == lines + 1:
+            # no constraints
+            self.lines.pop()
+
+    def model(self, model_name, checker):
+        declared = self.constant('DECLARED', 'frozenset(%r)' % (sorted(checker.declared),))
+
+        self.emit(0, '')
+        self.emit(0, '')
+        self.emit(0, 'def %s(value, path, sink):' % self.functions['model', model_name])
+        self.emit(1, 'if not isinstance(value, dict):')
+        self.emit(2, 'sink.add(%r, path, %r %% (describe(value),))' % ('type_invalid', 'expected %s got %%s' % model_name))
+        self.emit(2, 'return')
+        for property_name, segment in checker.required:
+            self.emit(1, 'if %r not in value:' % property_name)
+            self.emit(2, 'sink.add(%r, (path, %r))' % ('property_missing', segment))
+
+        self.emit(1, 'undeclared = [key for key in value if key not in %s]' % declared)
+        self.emit(1, 'if undeclared:')
+        self.emit(2, 'for key in sorted(undeclared):')
+        self.emit(3, 'sink.add(%r, (path, (%r, key)))' % ('property_undeclared', model_name))
+
+        for property_name, segment, property_checker in checker.properties:
+            self.emit(1, 'if %r in value:' % property_name)
+            self.emit(2, 'property_value = value[%r]' % property_name)
+            self.check(property_checker, 'property_value', '(path, %r)' % (segment,), 2)
+
+    def string_parameter(self, parameter, values):
+        param_path = '(None, (method, path, %r, %r))' % (parameter.param_type, parameter.name)
+        self.emit(1, 'if %r in %s:' % (parameter.name, values))
+        conversion = CONVERSIONS.get(parameter.type_name, False)
+        if conversion is None:
+            self.emit(2, 'param_value = %s[%r]' % (values, parameter.name))
+            self.check(parameter.checker, 'param_value', param_path, 2)
+        elif conversion is False:
+            self.emit(2, 'sink.add(%r, %s)' % ('type_convert', param_path))
+        else:
+            self.emit(2, 'try:')
+            self.emit(3, 'param_value = %s' % (conversion % ('%s[%r]' % (values, parameter.name))))
+            self.emit(2, 'except ValueError:')
+            self.emit(3, 'sink.add(%r, %s)' % ('type_convert', param_path))
+            self.emit(2, 'else:')
+            self.check(parameter.checker, 'param_value', param_path, 3)
+        if parameter.required:
+            self.emit(1, 'else:')
+            self.emit(2, 'sink.add(%r, %s)' % ('parameter_missing', param_path))
+
+    def request(self, name, operation):
+        self.emit(0, '')
+        self.emit(0, '')
+        self.emit(0, 'def %s(request, method, path, path_parameters, sink):' % name)
+        if not operation.has_parameters:
+            self.emit(1, 'pass  # skipping verification - by design')
+            return
+
+        declared_query = self.constant('QUERY', 'frozenset(%r)' % (sorted(operation.declared['query']),))
+        self.emit(1, "query = request.get('query') or {}")
+        self.emit(1, 'if not %s.issuperset(query):' % declared_query)
+        self.emit(2, 'for query_param_name in query:')
+        self.emit(3, 'if query_param_name not in %s:' % declared_query)
+        self.emit(4, "sink.add('parameter_undeclared', (None, (method, path, 'query', query_param_name)))")
+
+        if operation.parameters['header']:
+            self.emit(1, "headers = request.get('headers') or {}")
+
+        typed = set(name for name, _ in path_patterns(operation.operation))
+        # in declaration order, as the validator reports them
+        for parameter in operation.ordered_parameters:
+            param_name = parameter.name
+            if parameter.param_type == 'query':
+                self.string_parameter(parameter, 'query')
+            elif parameter.param_type == 'header':
+                self.string_parameter(parameter, 'headers')
+            elif parameter.param_type == 'body':
+                self.emit(1, 'if %r in request:' % param_name)
+                self.emit(2, 'try:')
+                self.emit(3, 'body = request[%r]' % param_name)
+                self.emit(2, 'except ValueError as e:')
+                self.emit(3, "sink.add('json_invalid', (None, (method, path, 'body')), str(e))")
+                self.emit(2, 'else:')
+                self.check(parameter.checker, 'body', "(None, (method, path, 'body'))", 3)
+                if parameter.required:
+                    self.emit(1, 'else:')
+                    self.emit(2, "sink.add('parameter_missing', (None, (method, path, 'body')))")
+            else:
+                self.emit(1, 'if %r not in path_parameters:' % param_name)
+                self.emit(2, "sink.add('parameter_missing', (None, (method, path, 'path', %r)))" % param_name)
+                if param_name in typed:
+                    # checked by the route match
+                    self.emit(1, 'elif %r in path_parameters.invalid:' % param_name)
+                    self.emit(2, "sink.add('type_convert', (None, (method, path, 'path', %r)))" % param_name)
+
+    @staticmethod
+    def path_parameters(operation_spec):
+        # what path_patterns needs to type the routes of the lookup
+        return [
+            dict((key, value) for key, value in sorted(parameter.items()) if key in ('name', 'paramType', 'type', 'enum'))
+            for parameter in operation_spec.get('parameters', [])
+            if parameter.get('paramType') == 'path'
+        ]
+
+    def response(self, name, operation):
+        self.emit(0, '')
+        self.emit(0, '')
+        self.emit(0, 'def %s(data, path, sink):' % name)
+        self.check(operation.response, 'data', 'path', 1)
+
+    def generate(self):
+        models = self.validator.models
+        for model_name in sorted(models):
+            self.function('model', model_name)
+        for model_name in sorted(models):
+            self.model(model_name, models[model_name])
+
+        apis = []
+        for api in self.validator.spec['apis']:
+            operations = []
+            for operation_spec in api['operations']:
+                operation = self.validator.operations[api['path'], operation_spec['method']]
+                name = operation_spec.get('nickname') or '%s_%s' % (operation_spec['method'], api['path'])
+                request_name = self.function('request', name)
+                response_name = self.function('response', name)
+                self.request(request_name, operation)
+                self.response(response_name, operation)
+                operations.append((operation_spec['method'], request_name, response_name, self.path_parameters(operation_spec)))
+            apis.append((api['path'], operations))
+
+        output = [HEADER]
+        if self.constants:
+            output.append('\n\n' + '\n'.join(self.constants) + '\n')
+        output.append('\n'.join(self.lines) + '\n')
+
+        output.append('\n\nIGNORE_ENDPOINTS = %r\n' % (list(self.ignore_endpoints),))
+        output.append('\n\nAPIS = [\n')
+        for path, operations in apis:
+            output.append('    {\n        %r: %r,\n        %r: [\n' % ('path', path, 'operations'))
+            for method, request_name, response_name, parameters in operations:
+                output.append('            {%r: %r, %r: %s, %r: %s, %r: %r},\n' % (
+                    'method', method, 'request', request_name, 'response', response_name, 'parameters', parameters,
+                ))
+            output.append('        ],\n    },\n')
+        output.append(']\n')
+
+        output.append(FOOTER)
+        return ''.join(output)
+
+
+def generate(spec, ignore_endpoints=()):
+    """Return the source of a validator module for ``spec``."""
+    return CodeGenerator(SwaggerValidator(spec), ignore_endpoints).generate()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a validator module from a Swagger spec.')
+    parser.add_argument('spec', help='JSON spec file')
+    parser.add_argument('-o', '--output', help='output file, stdout by default')
+    parser.add_argument('--ignore', action='append', default=[], metavar='REGEXP', help='endpoint to ignore, may be repeated')
+    args = parser.parse_args(argv)
+
+    with io.open(args.spec, encoding='utf-8') as fileobj:
+        spec = json.load(fileobj)
+
+    source = generate(spec, args.ignore)
+
+    if args.output:
+        with io.open(args.output, 'w', encoding='utf-8') as fileobj:
+            fileobj.write(source)
+    else:
+        sys.stdout.write(source)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,16 +3,23 @@
 from __future__ import with_statement, division, absolute_import, print_function
 
 
+import copy
+import itertools
 import re
+import threading
+import timeit
 
 
 from swagger_validator import five
-
-
-def prepend_path(errors, prefix):
-    for error in errors:
-        error['path'] = prefix + error.get('path', [])
-    return errors
+from swagger_validator.cache import ErrorRecorder
+from swagger_validator.checkers import (
+    SIMPLE_TYPES, ModelChecker, prepend_path, is_simple_type, compile_type_or_model, model_references,
+)
+from swagger_validator.fingerprint import Interner
+from swagger_validator.lru import LRUCache
+from swagger_validator.errors import ErrorCollector, ErrorLimitReached, ValidityCheck, reroot
+from swagger_validator.stats import MISSING_OPERATION
+from swagger_validator.stream import validate_stream
 
 
 def convert_type(new_type, value):
@@ -26,269 +33,818 @@ def convert_type(new_type, value):
         raise ValueError(new_type)
 
 
+# segment patterns of typed path parameters, see path_patterns
+PATH_TYPE_PATTERNS = {
+    'integer': r'[+-]?[0-9]+',
+    'number': r'[+-]?(?:[0-9]+(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?',
+}
+
+
+def path_patterns(operation):
+    """Return ``(name, compiled pattern)`` of the path parameters of
+    ``operation`` whose values have to match their declared type or enum."""
+    patterns = []
+    for parameter in operation.get('parameters', []):
+        if parameter.get('paramType') != 'path':
+            continue
+        if 'enum' in parameter:
+            pattern = '|'.join(re.escape(five.text_type(value)) for value in parameter['enum'])
+        else:
+            pattern = PATH_TYPE_PATTERNS.get(parameter.get('type'))
+        if pattern is not None:
+            patterns.append((parameter['name'], re.compile('(?:%s)\\Z' % pattern)))
+    return tuple(patterns)
+
+
+class PathParameters(dict):
+    """Path parameters of a route match; ``template`` is the path template
+    matched and ``invalid`` holds the names of values not matching their
+    declared type."""
+
+    template = None
+    invalid = frozenset()
+
+    def copy(self):
+        parameters = PathParameters(self)
+        parameters.template = self.template
+        parameters.invalid = self.invalid
+        return parameters
+
+
+class RouteNode(object):
+    def __init__(self):
+        # literal path segment -> RouteNode
+        self.literals = {}
+        # (matcher, RouteNode), matcher is a parameter name for "{name}"
+        # segments or a compiled regexp for segments mixing text and parameters
+        self.wildcards = []
+        # method -> (declaration index, operation, path_patterns, path template)
+        self.operations = {}
+
+    def copy(self):
+        node = RouteNode()
+        node.literals = dict(self.literals)
+        node.wildcards = list(self.wildcards)
+        node.operations = dict(self.operations)
+        return node
+
+    def child(self, segment, owned=None):
+        # with ``owned`` (the set of nodes that may be modified) shared
+        # children are copied before being returned, leaving the trie they
+        # came from untouched
+        parts = re.split(r'\{(\w+)\}', segment)
+
+        if len(parts) == 1:
+            node = self.literals.get(segment)
+            if node is None:
+                node = self.literals[segment] = RouteNode()
+            elif owned is not None and node not in owned:
+                node = self.literals[segment] = node.copy()
+            else:
+                return node
+            if owned is not None:
+                owned.add(node)
+            return node
+
+        if len(parts) == 3 and parts[0] == parts[2] == '':
+            matcher = parts[1]
+        else:
+            matcher = re.compile(''.join([
+                re.escape(part) if i % 2 == 0 else '(?P<' + part + '>[^/]*)'
+                for i, part in enumerate(parts)
+            ]) + '$')
+
+        for index, (wildcard_matcher, wildcard_node) in enumerate(self.wildcards):
+            if wildcard_matcher == matcher:
+                if owned is None or wildcard_node in owned:
+                    return wildcard_node
+                node = wildcard_node.copy()
+                self.wildcards[index] = (matcher, node)
+                owned.add(node)
+                return node
+
+        node = RouteNode()
+        self.wildcards.append((matcher, node))
+        if owned is not None:
+            owned.add(node)
+        return node
+
+
 class OperationLookup(object):
-    def __init__(self, apis, ignore_endpoints=()):
-        self.table = []
-        self.ignore_endpoints = [
-            re.compile(i) if isinstance(i, five.string_types) else i
-            for i in ignore_endpoints
-        ]
+    def __init__(self, apis, ignore_endpoints=(), cache_size=None):
+        self.root = RouteNode()
+        # (method, path) -> (operation, path parameters)
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.ignore_endpoints = self._compile_ignore_endpoints(ignore_endpoints)
 
+        self.size = 0
         for endpoint in apis:
             for operation in endpoint['operations']:
-                self.table.append((
-                    operation['method'],
-                    self._compile_path(endpoint['path']),
-                    operation,
-                ))
+                self._add(endpoint['path'], operation)
+
+    # group numbers shift when patterns are joined, and before Python 3.11
+    # an inline flag like (?i) of one pattern applies to the whole
+    # alternation, so patterns with backreferences or flags are matched on
+    # their own
+    UNJOINABLE = re.compile(r'\\[1-9]|\(\?P=|\(\?[aiLmsux]')
 
     @classmethod
-    def _compile_path(cls, path):
-        parts = re.split('\{(\w+)\}', path)
-        regexp = ''.join([
-            re.escape(part) if i % 2 == 0 else '(?P<' + part + '>[^/]*)'
-            for i, part in enumerate(parts)
-        ])
-        return re.compile(regexp + '$')
+    def _compile_ignore_endpoints(cls, ignore_endpoints):
+        # string patterns are joined into one alternation, so the common
+        # "not ignored" case costs a single match call
+        joinable = []
+        matchers = []
+        for ignore in ignore_endpoints:
+            if isinstance(ignore, five.string_types) and not cls.UNJOINABLE.search(ignore):
+                joinable.append(ignore)
+            elif isinstance(ignore, five.string_types):
+                matchers.append(re.compile(ignore))
+            else:
+                matchers.append(ignore)
+
+        if len(joinable) > 1:
+            try:
+                matchers.insert(0, re.compile('|'.join('(?:%s)' % ignore for ignore in joinable)))
+            except re.error:
+                matchers[0:0] = [re.compile(ignore) for ignore in joinable]
+        elif joinable:
+            matchers.insert(0, re.compile(joinable[0]))
+
+        return matchers
+
+    def _add(self, path, operation, owned=None):
+        node = self.root
+        for segment in path.split('/'):
+            node = node.child(segment, owned)
+        node.operations.setdefault(operation['method'], (self.size, operation, path_patterns(operation), path))
+        self.size += 1
+
+    def extended(self, apis):
+        """Return a new lookup with ``apis`` added, leaving this one intact.
+
+        Only the trie nodes on the paths of the added APIs are copied, the
+        rest is shared.  The new lookup starts with an empty cache.
+        """
+        lookup = copy.copy(self)
+        lookup.root = self.root.copy()
+        lookup.cache = LRUCache(self.cache.maxsize) if self.cache is not None else None
+
+        owned = set([lookup.root])
+        for endpoint in apis:
+            for operation in endpoint['operations']:
+                lookup._add(endpoint['path'], operation, owned)
+
+        return lookup
+
+    def _find(self, node, segments, position, method):
+        # returns (declaration index, operation, path parameters, path
+        # patterns) of the earliest declared matching operation, the same
+        # one a linear scan over the declarations would pick
+        if position == len(segments):
+            found = node.operations.get(method)
+            if found is None:
+                return None
+            path_parameters = PathParameters()
+            path_parameters.template = found[3]
+            return found[0], found[1], path_parameters, found[2]
+
+        segment = segments[position]
+        best = None
+
+        child = node.literals.get(segment)
+        if child is not None:
+            best = self._find(child, segments, position + 1, method)
+
+        for matcher, child in node.wildcards:
+            if isinstance(matcher, five.string_types):
+                params = {matcher: segment}
+            else:
+                match = matcher.match(segment)
+                if not match:
+                    continue
+                params = match.groupdict()
+
+            found = self._find(child, segments, position + 1, method)
+            if found is not None and (best is None or found[0] < best[0]):
+                found[2].update(params)
+                best = found
+
+        return best
 
     def get(self, method, path):
+        if self.cache is None:
+            return self._resolve(method, path)
+
+        result = self.cache.get((method, path))
+        if result is None:
+            result = self._resolve(method, path)
+            self.cache.set((method, path), result)
+
+        operation, path_parameters = result
+        if path_parameters:
+            # callers own the returned dict
+            path_parameters = path_parameters.copy()
+        return operation, path_parameters
+
+    def _resolve(self, method, path):
         for ignore in self.ignore_endpoints:
             if ignore.match(path):
                 return False, None
 
-        for table_method, table_path, table_result in self.table:
-            if method == table_method:
-                match = table_path.match(path)
-                if match:
-                    return table_result, match.groupdict()
+        found = self._find(self.root, path.split('/'), 0, method)
+        if found is None:
+            return None, None
 
-        return None, None
+        _, operation, path_parameters, patterns = found
+        # typed parameters are checked as part of the match, so the result
+        # is cached along with the route
+        invalid = [
+            name for name, pattern in patterns
+            if name in path_parameters and not pattern.match(path_parameters[name])
+        ]
+        if invalid:
+            path_parameters.invalid = frozenset(invalid)
+        return operation, path_parameters
+
+
+class CompiledParameter(object):
+    def __init__(self, parameter_spec, models):
+        self.name = parameter_spec['name']
+        self.param_type = parameter_spec['paramType']
+        self.type_name = parameter_spec.get('type')
+        # 'path' params are always required
+        self.required = parameter_spec.get('required', False) or self.param_type == 'path'
+        self.checker = compile_type_or_model(parameter_spec, models)
+
+
+class CompiledOperation(object):
+    PARAM_TYPES = ('body', 'header', 'path', 'query')
+
+    def __init__(self, operation, models, path=None):
+        self.operation = operation
+        # path template of the api, and the nickname or method and path
+        # template, used by stats
+        self.path = path
+        self.name = operation.get('nickname') or '%s %s' % (operation.get('method', ''), path)
+        self.response = compile_type_or_model(operation, models)
+        # skipping verification of operations without 'parameters' - by design
+        self.has_parameters = 'parameters' in operation
+
+        # paramType -> name -> CompiledParameter
+        self.parameters = dict((param_type, {}) for param_type in self.PARAM_TYPES)
+        required = dict((param_type, []) for param_type in self.PARAM_TYPES)
+        ordered = []
+
+        for parameter_spec in operation.get('parameters', []):
+            parameter = CompiledParameter(parameter_spec, models)
+            if parameter.param_type not in self.parameters:
+                continue  # unsupported
+            if parameter.name in self.parameters[parameter.param_type]:
+                continue
+            self.parameters[parameter.param_type][parameter.name] = parameter
+            ordered.append(parameter)
+            if parameter.required:
+                required[parameter.param_type].append(parameter.name)
+
+        # in declaration order, which is the order of the errors
+        self.ordered_parameters = tuple(ordered)
+        # paramType -> declared names / required names
+        self.declared = dict(
+            (param_type, frozenset(parameters))
+            for param_type, parameters in self.parameters.items()
+        )
+        self.required = dict(
+            (param_type, tuple(names))
+            for param_type, names in required.items()
+        )
 
+    def iter_parameters(self):
+        return iter(self.ordered_parameters)
 
-class SwaggerValidator(object):
-    def __init__(self, spec, ignore_endpoints=()):
-        self.spec = spec
-        self.lookup = OperationLookup(
-            apis=spec['apis'],
-            ignore_endpoints=ignore_endpoints,
-        )
 
-    def merge(self, spec):
-        merge_results = []
+class ValidatorState(object):
+    """Snapshot of everything validation reads.
 
-        apis_mapping = dict((api['path'], api) for api in self.spec['apis'])
-        for api in spec.get('apis', []):
-            if api['path'] in apis_mapping:
-                if api != apis_mapping[api['path']]:
-                    merge_results.append({'code': 'merge_apis_conflict', 'path': [api['path']]})
-            else:
-                self.spec['apis'].append(api)
+    A state is never modified once published; ``SwaggerValidator.merge``
+    builds a new one and swaps it in with a single assignment, so readers
+    need no lock and always see a consistent spec.
+    """
 
-        for model_name, model_spec in spec.get('models', {}).items():
-            if model_name in self.spec['models']:
-                if model_spec != self.spec['models'][model_name]:
-                    merge_results.append({'code': 'merge_model_conflict', 'path': [model_name]})
-            else:
-                self.spec['models'][model_name] = model_spec
+    def __init__(self, spec, lookup, models, operations, dangling, fingerprints):
+        self.spec = spec
+        self.lookup = lookup
+        self.models = models
+        # (path template, method) -> CompiledOperation; equal operations of
+        # different apis are one interned dict, so they can not be told
+        # apart by id()
+        self.operations = operations
+        # names of models referred to but not defined
+        self.dangling = dangling
+        # api path / model name -> structural digest, used by merge
+        self.fingerprints = fingerprints
 
-        self.lookup = OperationLookup(self.spec['apis'])
+    @classmethod
+    def build(cls, spec, lookup, fingerprints):
+        models = {}
+        operations = {}
+        dangling = cls._compile(models, operations, spec.get('models', {}), spec['apis'])
+        return cls(spec, lookup, models, operations, dangling, fingerprints)
+
+    @staticmethod
+    def _compile(models, operations, models_spec, apis):
+        # compiles into ``models`` and ``operations``, returns the names of
+        # the models the new checkers refer to
+        checkers = []
+        for model_name, model_spec in models_spec.items():
+            models[model_name] = ModelChecker(model_name, model_spec, models)
+            checkers.append(models[model_name])
+        for api in apis:
+            for operation in api['operations']:
+                key = (api['path'], operation['method'])
+                if key in operations:
+                    continue  # the lookup routes to the first one as well
+                compiled = operations[key] = CompiledOperation(operation, models, api['path'])
+                checkers.append(compiled.response)
+                checkers.extend(parameter.checker for parameter in compiled.iter_parameters())
+
+        references = set()
+        for checker in checkers:
+            references.update(model_references(checker))
+        return references - set(models)
+
+    def resolve(self, method, path):
+        # (CompiledOperation or False/None as returned by lookup, path parameters)
+        operation, path_parameters = self.lookup.get(method, path)
+        if operation:
+            operation = self.operations[path_parameters.template, operation['method']]
+        return operation, path_parameters
 
-        return merge_results
+    def merged(self, spec, apis, models_spec, fingerprints):
+        lookup = self.lookup.extended(apis)
 
-    SIMPLE_TYPES = {
-        'boolean': (bool, ()),
-        'string': (five.string_types, ()),
-        'integer': (five.integer_types, bool),
-        'number': (five.integer_types + (float,), bool),
-        'array': (list, ()),
-    }
+        if self.dangling.intersection(models_spec):
+            # existing checkers refer to the old models mapping, where these
+            # models are missing - recompile everything
+            return ValidatorState.build(spec, lookup, fingerprints)
 
-    def validate_type(self, type_spec, value):
-        type_name = type_spec.get('type', 'string')
-        if type_name not in self.SIMPLE_TYPES:
-            return None
+        models = dict(self.models)
+        operations = dict(self.operations)
+        dangling = self._compile(models, operations, models_spec, apis)
+        dangling.update(self.dangling)
+        dangling.difference_update(models)
+        return ValidatorState(spec, lookup, models, operations, dangling, fingerprints)
 
-        type_inc, type_exc = self.SIMPLE_TYPES[type_name]
-        if not isinstance(value, type_inc) or isinstance(value, type_exc):
-            return [{
-                'code': 'type_invalid',
-                'msg': 'expected %s got %r' % (type_name, value),
-            }]
-
-        validation_results = []
-
-        if type_name == 'string':
-            if 'enum' in type_spec and value not in type_spec['enum']:
-                validation_results.append({
-                    'code': 'type_constraint',
-                    'path': ['enum'],
-                    'msg': 'expected integer got %r' % value,
-                })
-
-        if type_name in ('integer', 'number'):
-            if 'minimum' in type_spec and value < float(type_spec['minimum']):
-                validation_results.append({
-                    'code': 'type_constraint',
-                    'path': ['minimum'],
-                    'msg': 'expected not less than %r got %r' % (type_spec['maximum'], value),
-                })
-
-            if 'maximum' in type_spec and value > float(type_spec['maximum']):
-                validation_results.append({
-                    'code': 'type_constraint',
-                    'path': ['maximum'],
-                    'msg': 'expected not more than %r got %r' % (type_spec['maximum'], value),
-                })
-        if type_name == 'array' and 'items' in type_spec:
-            for item_index, item_value in enumerate(value):
-                item_results = self.validate_type_or_model(type_spec['items'], item_value)
-                validation_results.extend(prepend_path(item_results, [str(item_index)]))
-
-        return validation_results
 
-    def validate_model(self, model_name, model_instance):
-        if model_name not in self.spec['models']:
-            return [
-                {'code': 'model_missing', 'path': [model_name]},
-            ]
+class SwaggerValidator(object):
+    # parameter types returned by validate_and_coerce_request
+    COERCED_TYPES = ('path', 'query', 'header')
+    # options holding per process state rather than describing the
+    # validation, see artifact.load_validator
+    RUNTIME_OPTIONS = ('stats', 'sampling', 'result_cache')
+
+    def __init__(self, spec, ignore_endpoints=(), route_cache_size=None, stats=None, sampling=None, result_cache=None):
+        # receives per operation counts and timings, see stats.ValidationStats
+        self.stats = stats
+        # decides what gets validated, see sampling.SamplingPolicy
+        self.sampling = sampling
+        # results of repeated response payloads, see cache.ResultCache
+        self.result_cache = result_cache
+
+        # equal subtrees of all merged specs are shared, and every api and
+        # model is fingerprinted once, so merge conflicts are found by
+        # comparing digests
+        self._interner = Interner()
+        self._merge_lock = threading.Lock()
+
+        apis, api_fingerprints = self._intern_apis(spec['apis'], {})
+        models, model_fingerprints = self._intern_models(spec.get('models', {}), {})
+        spec = dict(spec, apis=apis, models=models)
+
+        lookup = OperationLookup(
+            apis=spec['apis'],
+            ignore_endpoints=ignore_endpoints,
+            cache_size=route_cache_size,
+        )
+        self.state = ValidatorState.build(spec, lookup, (api_fingerprints, model_fingerprints))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_merge_lock']
+        # the interner is only needed by merge and is rebuilt on demand
+        state['_interner'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._merge_lock = threading.Lock()
+
+    @property
+    def spec(self):
+        return self.state.spec
+
+    @property
+    def lookup(self):
+        return self.state.lookup
+
+    @property
+    def models(self):
+        return self.state.models
+
+    @property
+    def operations(self):
+        return self.state.operations
+
+    def compile(self):
+        """Turn the spec into a tree of checkers, so validation does not
+        have to interpret the spec dicts on every call."""
+        with self._merge_lock:
+            state = self.state
+            self.state = ValidatorState.build(state.spec, state.lookup, state.fingerprints)
+
+    def _intern_apis(self, apis, fingerprints, merge_results=None):
+        # returns the apis with paths not in ``fingerprints`` yet and the
+        # updated fingerprints; apis conflicting with a known one with the
+        # same path are reported to ``merge_results``
+        fingerprints = dict(fingerprints)
+        added = []
+        for api in apis:
+            digest, api = self._interner.intern(api)
+            if api['path'] not in fingerprints:
+                fingerprints[api['path']] = digest
+                added.append(api)
+            elif merge_results is None:
+                # repeated paths of the initial spec are kept as they are
+                added.append(api)
+            elif fingerprints[api['path']] != digest:
+                merge_results.append({'code': 'merge_apis_conflict', 'path': [api['path']]})
+        return added, fingerprints
+
+    def _intern_models(self, models, fingerprints, merge_results=None):
+        fingerprints = dict(fingerprints)
+        added = {}
+        for model_name, model_spec in models.items():
+            digest, model_spec = self._interner.intern(model_spec)
+            if model_name not in fingerprints:
+                fingerprints[model_name] = digest
+                added[model_name] = model_spec
+            elif merge_results is not None and fingerprints[model_name] != digest:
+                merge_results.append({'code': 'merge_model_conflict', 'path': [model_name]})
+        return added, fingerprints
 
-        validation_results = []
+    def merge(self, spec):
+        with self._merge_lock:
+            state = self.state
+            merge_results = []
 
-        model_spec = self.spec['models'][model_name]
+            if self._interner is None:
+                self._interner = Interner()
+                for item in state.spec['apis'] + list(state.spec['models'].values()):
+                    self._interner.intern(item)
+            api_fingerprints, model_fingerprints = state.fingerprints
 
-        keys = set(model_instance.keys())
+            apis, api_fingerprints = self._intern_apis(spec.get('apis', []), api_fingerprints, merge_results)
+            models, model_fingerprints = self._intern_models(spec.get('models', {}), model_fingerprints, merge_results)
 
-        for required_property in model_spec.get('required', []):
-            if required_property not in model_instance:
-                validation_results.append(
-                    {'code': 'property_missing', 'path': [model_name, required_property]},
-                )
+            # copy-on-write, the published spec is never modified
+            merged_spec = dict(state.spec)
+            merged_spec['apis'] = state.spec['apis'] + apis
+            merged_spec['models'] = dict(state.spec['models'])
+            merged_spec['models'].update(models)
 
-        declared_properties = set(model_spec.get('properties', {}))
+            self.state = state.merged(merged_spec, apis, models, (api_fingerprints, model_fingerprints))
+            if self.result_cache is not None:
+                self.result_cache.clear()
 
-        for undeclared_property in sorted(keys - declared_properties):
-            validation_results.append(
-                {'code': 'property_undeclared', 'path': [model_name, undeclared_property]},
-            )
+            return merge_results
 
-        for property_name, property_spec in sorted(model_spec.get('properties', {}).items()):
-            if property_name not in model_instance:
-                continue
+    SIMPLE_TYPES = SIMPLE_TYPES
 
-            simple_result = self.validate_type_or_model(property_spec, model_instance[property_name])
-            validation_results.extend(prepend_path(simple_result, [model_name, property_name]))
+    def validate_type(self, type_spec, value):
+        if not is_simple_type(type_spec):
+            return None
+        return self.validate_type_or_model(type_spec, value)
 
-        return validation_results
+    def validate_model(self, model_name, model_instance):
+        models = self.state.models
+        sink = ErrorCollector()
+        if model_name not in models:
+            sink.add('model_missing', (None, model_name))
+        else:
+            models[model_name](model_instance, None, sink)
+        return sink.errors
 
     def validate_type_or_model(self, type_spec, value):
-        validation_results = self.validate_type(type_spec, value)
+        sink = ErrorCollector()
+        compile_type_or_model(type_spec, self.state.models)(value, None, sink)
+        return sink.errors
+
+    @staticmethod
+    def _collect(validate, value, max_errors=None, fail_fast=False):
+        sink = ErrorCollector(1 if fail_fast else max_errors)
+        try:
+            validate(value, sink)
+        except ErrorLimitReached:
+            pass
+        return sink.errors
+
+    @staticmethod
+    def _check(validate, value):
+        try:
+            validate(value, ValidityCheck())
+        except ErrorLimitReached:
+            return False
+        return True
+
+    def _collect_observed(self, kind, validate_operation, value, max_errors, fail_fast):
+        # _collect with the lookup and the validation timed separately, for
+        # the stats sink and the sampling policy
+        method = value['method'].upper()
+        path = value['path']
+
+        started = timeit.default_timer()
+        operation, path_parameters = self.state.resolve(method, path)
+        if operation is False:
+            return []
+        name = MISSING_OPERATION if operation is None else operation.name
 
-        if validation_results is not None:
-            return validation_results
-        else:
-            return self.validate_model(type_spec['type'], value)
+        sampling = self.sampling
+        if sampling is not None and operation is not None and not sampling.should_validate(kind, name):
+            return []
 
-    def validate_request(self, request):
+        sink = ErrorCollector(1 if fail_fast else max_errors)
+        resolved = timeit.default_timer()
+        try:
+            validate_operation(value, method, path, operation, path_parameters, sink)
+        except ErrorLimitReached:
+            pass
+        validated = timeit.default_timer()
+
+        if sampling is not None:
+            sampling.observe(kind, name, validated - resolved, sink.errors)
+        if self.stats is not None:
+            self.stats.record(kind, name, resolved - started, validated - resolved, sink.errors)
+        return sink.errors
+
+    def validate_request(self, request, max_errors=None, fail_fast=False):
+        if self.stats is not None or self.sampling is not None:
+            return self._collect_observed('request', self._validate_request_operation, request, max_errors, fail_fast)
+        return self._collect(self._validate_request, request, max_errors, fail_fast)
+
+    def validate_response(self, response, max_errors=None, fail_fast=False):
+        if self.stats is not None or self.sampling is not None:
+            return self._collect_observed('response', self._validate_response_operation, response, max_errors, fail_fast)
+        return self._collect(self._validate_response, response, max_errors, fail_fast)
+
+    def validate_and_coerce_request(self, request, max_errors=None, fail_fast=False):
+        """Validate ``request`` returning its errors and the declared path,
+        query and header parameters converted to their types, as
+        ``{'path': {name: value}, 'query': {...}, 'header': {...}}``.
+
+        The errors are the ones ``validate_request`` returns.  Values failing
+        conversion are left out, as are those not reached before
+        ``max_errors``.  Requests are always validated, neither sampling nor
+        stats apply.
+        """
+        coerced = dict((param_type, {}) for param_type in self.COERCED_TYPES)
+
+        def validate(request, sink):
+            method = request['method'].upper()
+            path = request['path']
+            operation, path_parameters = self.state.resolve(method, path)
+            self._validate_request_operation(request, method, path, operation, path_parameters, sink, coerced)
+
+        return self._collect(validate, request, max_errors, fail_fast), coerced
+
+    def is_valid_request(self, request):
+        return self._check(self._validate_request, request)
+
+    def is_valid_response(self, response):
+        return self._check(self._validate_response, response)
+
+    def report_request(self, request, sink):
+        """Validate ``request`` reporting errors to ``sink`` (for example an
+        ``errors.ErrorAggregator``), with error paths rooted at the path
+        template of the operation instead of the requested path."""
+        self._report(self._validate_request_operation, request, sink)
+
+    def report_response(self, response, sink):
+        self._report(self._validate_response_operation, response, sink)
+
+    def _report(self, validate_operation, value, sink):
+        method = value['method'].upper()
+        path = value['path']
+        operation, path_parameters = self.state.resolve(method, path)
+        if operation:
+            path = operation.path
+        try:
+            validate_operation(value, method, path, operation, path_parameters, sink)
+        except ErrorLimitReached:
+            pass
+
+    def validate_response_stream(self, method, path, fileobj, max_errors=None, fail_fast=False):
+        """Validate a JSON response body read incrementally from ``fileobj``
+        (binary or text), without loading it into memory."""
+        method = method.upper()
+        operation, path_parameters = self.state.resolve(method, path)
+        sink = ErrorCollector(1 if fail_fast else max_errors)
+
+        try:
+            if operation is None:
+                sink.add('operation_missing', (None, (method, path)))
+            elif operation is not False:
+                data_path = (None, (method, path, 'data'))
+                try:
+                    validate_stream(operation.response, fileobj, data_path, sink)
+                except ValueError as e:
+                    sink.add('json_invalid', data_path, str(e))
+        except ErrorLimitReached:
+            pass
+
+        return sink.errors
+
+    def validate_requests(self, requests, max_errors=None, fail_fast=False, chunk_size=1000):
+        """Validate an iterable of requests, yielding error lists in input order.
+
+        Routes are resolved once per distinct ``(method, path)`` and each
+        chunk of ``chunk_size`` items is validated grouped by operation, so
+        memory use does not depend on the length of the input.
+        """
+        return self._validate_batch(self._validate_request_operation, requests, max_errors, fail_fast, chunk_size)
+
+    def validate_responses(self, responses, max_errors=None, fail_fast=False, chunk_size=1000):
+        return self._validate_batch(self._validate_response_operation, responses, max_errors, fail_fast, chunk_size)
+
+    def _validate_batch(self, validate, items, max_errors, fail_fast, chunk_size):
+        if fail_fast:
+            max_errors = 1
+        routes = {}
+        items = iter(items)
+        state = None
+
+        while True:
+            chunk = list(itertools.islice(items, chunk_size))
+            if not chunk:
+                return
+
+            if state is not self.state:
+                state = self.state
+                routes.clear()
+
+            groups = {}
+            for index, item in enumerate(chunk):
+                method = item['method'].upper()
+                path = item['path']
+                route = routes.get((method, path))
+                if route is None:
+                    if len(routes) >= chunk_size:
+                        routes.clear()
+                    route = routes[method, path] = state.resolve(method, path)
+                groups.setdefault(id(route[0]), []).append((index, item, method, path, route))
+
+            results = [None] * len(chunk)
+            for group in groups.values():
+                for index, item, method, path, (operation, path_parameters) in group:
+                    sink = ErrorCollector(max_errors)
+                    try:
+                        validate(item, method, path, operation, path_parameters, sink)
+                    except ErrorLimitReached:
+                        pass
+                    results[index] = sink.errors
+
+            for result in results:
+                yield result
+
+    def _validate_request(self, request, sink):
         method = request['method'].upper()
         path = request['path']
-        operation, path_parameters = self.lookup.get(method, path)
+        operation, path_parameters = self.state.resolve(method, path)
+        self._validate_request_operation(request, method, path, operation, path_parameters, sink)
 
+    def _validate_request_operation(self, request, method, path, operation, path_parameters, sink, coerced=None):
+        # coerced: param type -> name -> converted value, filled if given
         if operation is False:
-            return []
+            return
 
         if operation is None:
-            return [
-                {'code': 'operation_missing', 'path': [method, path]},
-            ]
+            sink.add('operation_missing', (None, (method, path)))
+            return
 
-        # skipping verification - by design
-        if 'parameters' not in operation:
-            return []
+        if not operation.has_parameters:
+            return
 
-        validation_results = []
+        query = request.get('query') or {}
+        declared_query = operation.declared['query']
+        if not declared_query.issuperset(query):
+            for query_param_name in query:
+                if query_param_name not in declared_query:
+                    sink.add('parameter_undeclared', (None, (method, path, 'query', query_param_name)))
 
-        declared_query_params = set(
-            parameter_spec['name']
-            for parameter_spec in operation['parameters']
-            if parameter_spec['paramType'] == 'query'
-        )
-        for query_param_name in request.get('query', {}):
-            if query_param_name not in declared_query_params:
-                validation_results.append(
-                    {'code': 'parameter_undeclared', 'path': [method, path, 'query', query_param_name]},
-                )
+        # fetched only for operations declaring header parameters
+        headers = (request.get('headers') or {}) if operation.parameters['header'] else None
 
-        for parameter_spec in operation['parameters']:
-            param_type = parameter_spec['paramType']
-            param_name = parameter_spec['name']
+        for parameter in operation.ordered_parameters:
+            param_type = parameter.param_type
+            param_name = parameter.name
 
-            if param_type == 'body':
-                if param_name in request:
-                    body_results = self.validate_type_or_model(parameter_spec, request[param_name])
-                    validation_results.extend(prepend_path(body_results, [method, path, 'body']))
-                elif parameter_spec.get('required', False):
-                    validation_results.append(
-                        {'code': 'parameter_missing', 'path': [method, path, 'body']},
-                    )
-            elif param_type == 'header':
-                if param_name in request.get('headers', {}):
-                    header_value = request['headers'][param_name]
+            if param_type == 'query' or param_type == 'header':
+                values = query if param_type == 'query' else headers
+                if param_name in values:
                     try:
-                        header_value = convert_type(parameter_spec['type'], header_value)
-                        header_results = self.validate_type_or_model(parameter_spec, header_value)
-                        validation_results.extend(prepend_path(header_results, [method, path, 'header', param_name]))
+                        value = convert_type(parameter.type_name, values[param_name])
                     except ValueError:
-                        validation_results.append(
-                            {'code': 'type_convert', 'path': [method, path, 'header', param_name]},
-                        )
-                elif parameter_spec.get('required', False):
-                    validation_results.append(
-                        {'code': 'parameter_missing', 'path': [method, path, 'header', param_name]},
-                    )
-            elif param_type == 'path':
-                if param_name in path_parameters:
-                    pass
-                else:
-                    # 'path' params are always required
-                    validation_results.append(
-                        {'code': 'parameter_missing', 'path': [method, path, 'path', param_name]},
-                    )
-            elif param_type == 'query':
-                if param_name in request.get('query', {}):
-                    query_value = request['query'][param_name]
+                        sink.add('type_convert', (None, (method, path, param_type, param_name)))
+                    else:
+                        if coerced is not None:
+                            coerced[param_type][param_name] = value
+                        parameter.checker(value, (None, (method, path, param_type, param_name)), sink)
+                elif parameter.required:
+                    sink.add('parameter_missing', (None, (method, path, param_type, param_name)))
+
+            elif param_type == 'body':
+                if param_name in request:
+                    body_path = (None, (method, path, 'body'))
                     try:
-                        query_value = convert_type(parameter_spec['type'], query_value)
-                        query_value = self.validate_type_or_model(parameter_spec, query_value)
-                        validation_results.extend(prepend_path(query_value, [method, path, 'query', param_name]))
-                    except ValueError:
-                        validation_results.append(
-                            {'code': 'type_convert', 'path': [method, path, 'query', param_name]},
-                        )
-                elif parameter_spec.get('required', False):
-                    validation_results.append(
-                        {'code': 'parameter_missing', 'path': [method, path, 'query', param_name]},
-                    )
-            else:
-                pass  # unsupported
+                        # adapters parse the body on access
+                        body = request[param_name]
+                    except ValueError as e:
+                        sink.add('json_invalid', body_path, str(e))
+                    else:
+                        parameter.checker(body, body_path, sink)
+                elif parameter.required:
+                    sink.add('parameter_missing', (None, (method, path, 'body')))
 
-        return validation_results
+            else:
+                # types of path parameters are checked by the route match
+                param_path = (None, (method, path, 'path', param_name))
+                if param_name not in path_parameters:
+                    sink.add('parameter_missing', param_path)
+                elif param_name in path_parameters.invalid:
+                    sink.add('type_convert', param_path)
+                elif coerced is not None:
+                    # converted only, so the errors are the same as without
+                    # coercion; types the route match does not check are left out
+                    try:
+                        coerced['path'][param_name] = convert_type(parameter.type_name, path_parameters[param_name])
+                    except ValueError:
+                        pass
 
-    def validate_response(self, response):
+    def _validate_response(self, response, sink):
         method = response['method'].upper()
         path = response['path']
-        operation, path_parameters = self.lookup.get(method, path)
+        operation, path_parameters = self.state.resolve(method, path)
+        self._validate_response_operation(response, method, path, operation, path_parameters, sink)
 
+    def _validate_response_operation(self, response, method, path, operation, path_parameters, sink):
         if operation is False:
-            return []
+            return
 
         if operation is None:
-            return [
-                {'code': 'operation_missing', 'path': [method, path]},
-            ]
+            sink.add('operation_missing', (None, (method, path)))
+            return
 
         # skipping verification - by design
         if 'data' not in response:
-            return []
+            return
+
+        if self.result_cache is not None:
+            self._validate_response_cached(response, method, path, operation, sink)
+            return
 
-        body_results = self.validate_type_or_model(operation, response['data'])
-        return prepend_path(body_results, [method, path, 'data'])
+        self._validate_response_data(response, (None, (method, path, 'data')), operation, sink)
+
+    @staticmethod
+    def _validate_response_data(response, data_path, operation, sink):
+        try:
+            # adapters parse the body on access
+            data = response['data']
+        except ValueError as e:
+            sink.add('json_invalid', data_path, str(e))
+        else:
+            operation.response(data, data_path, sink)
+
+    def _validate_response_cached(self, response, method, path, operation, sink):
+        cache = self.result_cache
+        raw_data = response.get('raw_data')
+        if raw_data is None:
+            digest = cache.digest(response['data'])
+        else:
+            # serialized bodies are not parsed on hits
+            digest = cache.digest(None, raw_data)
+        if digest is None:
+            self._validate_response_data(response, (None, (method, path, 'data')), operation, sink)
+            return
+
+        # compiled operations are replaced whenever merge changes what they
+        # check, so results keyed by them never go stale
+        key = (operation, digest)
+        records = cache.get(key)
+        if records is None:
+            recorder = ErrorRecorder()
+            # recorded relative to the data, so they apply to any path
+            self._validate_response_data(response, None, operation, recorder)
+            records = tuple(recorder.records)
+            cache.set(key, records)
+
+        data_path = (None, (method, path, 'data'))
+        for code, node, msg in records:
+            sink.add(code, reroot(node, data_path), msg)
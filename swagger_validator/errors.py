@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import threading
+
+
+from swagger_validator import five
+
+
+# Error paths are kept as parent-pointer chains of ``(parent, segment)``
+# tuples ending in ``None``.  A segment is a string, an array index (an int)
+# or a tuple of strings.  Descending one level costs a single tuple, and the
+# path list is only built for the errors that get collected.
+
+def path_from_list(path):
+    if not path:
+        return None
+    return (None, tuple(path))
+
+
+def materialize_path(node):
+    parts = []
+    while node is not None:
+        node, segment = node
+        if isinstance(segment, tuple):
+            parts.extend(reversed(segment))
+        elif isinstance(segment, five.integer_types):
+            parts.append(str(segment))
+        else:
+            parts.append(segment)
+    parts.reverse()
+    return parts
+
+
+def path_template(node):
+    # the path as a tuple, with array indexes replaced by '*'
+    parts = []
+    while node is not None:
+        node, segment = node
+        if isinstance(segment, tuple):
+            parts.extend(reversed(segment))
+        elif isinstance(segment, five.integer_types):
+            parts.append('*')
+        else:
+            parts.append(segment)
+    parts.reverse()
+    return tuple(parts)
+
+
+def reroot(node, root):
+    # ``node`` with the ``None`` ending its chain replaced by ``root``
+    segments = []
+    while node is not None:
+        node, segment = node
+        segments.append(segment)
+    for segment in reversed(segments):
+        root = (root, segment)
+    return root
+
+
+class ValidationError(dict):
+    """Validation result, a plain ``{'code', 'path', 'msg'}`` dict.
+
+    The ``'path'`` key is only present for errors that have a path and the
+    ``'msg'`` key only for errors that have a message.  Paths are built from
+    the parent-pointer chain once, when the error is collected.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, code, node=None, msg=None):
+        super(ValidationError, self).__init__(code=code)
+        if node is not None:
+            self['path'] = materialize_path(node)
+        if msg is not None:
+            self['msg'] = msg
+
+
+class ErrorLimitReached(Exception):
+    """Raised by sinks to abort the traversal once enough errors were seen."""
+
+
+class ErrorCollector(object):
+    def __init__(self, max_errors=None):
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add(self, code, node=None, msg=None):
+        max_errors = self.max_errors
+        if max_errors is not None and len(self.errors) >= max_errors:
+            # only with max_errors=0, otherwise the traversal stopped already
+            raise ErrorLimitReached()
+        self.errors.append(ValidationError(code, node, msg))
+        if max_errors is not None and len(self.errors) >= max_errors:
+            raise ErrorLimitReached()
+
+
+class ValidityCheck(object):
+    """Sink for yes/no answers, stops at the first error without building it."""
+
+    def add(self, code, node=None, msg=None):
+        raise ErrorLimitReached()
+
+
+class ErrorAggregator(object):
+    """Sink counting errors by code and path template instead of keeping them.
+
+    Array indexes in paths are replaced by ``'*'``, and
+    ``SwaggerValidator.report_request`` and ``report_response`` root paths
+    at the path template of the operation, so the number of distinct keys
+    depends on the spec, not on the traffic.  Up to ``max_samples`` messages
+    are kept per key; errors of keys beyond ``max_keys`` are only counted in
+    ``dropped``.
+    """
+
+    def __init__(self, max_samples=3, max_keys=10000):
+        self.max_samples = max_samples
+        self.max_keys = max_keys
+        # (code, path template) -> count
+        self.counts = {}
+        # (code, path template) -> sample messages
+        self.samples = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, code, node=None, msg=None):
+        key = (code, path_template(node))
+        with self._lock:
+            count = self.counts.get(key)
+            if count is None:
+                if len(self.counts) >= self.max_keys:
+                    self.dropped += 1
+                    return
+                count = 0
+            self.counts[key] = count + 1
+            if msg is not None and count < self.max_samples:
+                samples = self.samples.setdefault(key, [])
+                if len(samples) < self.max_samples:
+                    samples.append(msg)
+
+    def clear(self):
+        with self._lock:
+            self.counts = {}
+            self.samples = {}
+            self.dropped = 0
+
+    def report(self):
+        """Return ``{'code', 'path', 'count', 'samples'}`` dicts, most frequent first."""
+        with self._lock:
+            counts = list(self.counts.items())
+            samples = dict((key, list(messages)) for key, messages in self.samples.items())
+        counts.sort(key=lambda item: (-item[1], item[0]))
+        return [
+            {'code': code, 'path': list(template), 'count': count, 'samples': samples.get((code, template), [])}
+            for (code, template), count in counts
+        ]
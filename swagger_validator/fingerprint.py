@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import hashlib
+
+
+from swagger_validator import five
+
+
+def _leaf_token(value):
+    # canonical bytes of a scalar, fed to the digest of its container
+    if value is None:
+        return b'n'
+    elif value is True:
+        return b't'
+    elif value is False:
+        return b'f'
+    elif isinstance(value, five.string_types):
+        return b's' + value.encode('utf-8')
+    elif isinstance(value, float) and not value.is_integer():
+        return b'#' + repr(value).encode('ascii')
+    else:
+        # 1 == 1.0, keep the digests equal as well
+        return b'#' + str(int(value)).encode('ascii')
+
+
+def _update(hasher, token):
+    hasher.update(('%d:' % len(token)).encode('ascii'))
+    hasher.update(token)
+
+
+class Interner(object):
+    """Computes structural fingerprints of JSON values and shares equal subtrees.
+
+    ``intern(value)`` returns ``(digest, value)``: a stable SHA-1 digest of
+    the value's structure (for scalars just their canonical bytes) and an
+    equal value in which every dict or list that was seen before (anywhere)
+    is replaced by the first seen copy.
+    Containers are only rebuilt when one of their children was replaced, so
+    interning something already interned returns the very same object.
+    """
+
+    def __init__(self):
+        # digest -> first seen container with that digest
+        self.table = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def intern(self, value):
+        if isinstance(value, dict):
+            items = []
+            changed = False
+            hasher = hashlib.sha1(b'{')
+            for key in sorted(value):
+                digest, item = self.intern(value[key])
+                _update(hasher, _leaf_token(key))
+                _update(hasher, digest)
+                changed = changed or item is not value[key]
+                items.append((key, item))
+            if changed:
+                value = dict(items)
+        elif isinstance(value, (list, tuple)):
+            items = []
+            changed = False
+            hasher = hashlib.sha1(b'[')
+            for item in value:
+                digest, interned = self.intern(item)
+                _update(hasher, digest)
+                changed = changed or interned is not item
+                items.append(interned)
+            if changed:
+                value = type(value)(items)
+        else:
+            return _leaf_token(value), value
+
+        digest = hasher.digest()
+        return digest, self.table.setdefault(digest, value)
@@ -20,3 +20,9 @@ else:
     text_type = unicode
     string_types = (str, unicode)
     integer_types = (int, long)
+
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
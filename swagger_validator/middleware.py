@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Validation of live traffic: a WSGI middleware and the background
+validator it (and ``swagger_validator.asgi``) hands responses to.
+
+Requests are validated inline, before the application sees them; responses
+are queued and validated by background threads, so they never add to the
+latency seen by clients.  When the queue is full responses are dropped and
+counted instead of blocking.  Results go to ``report(kind, item, errors)``,
+``kind`` being ``'request'`` or ``'response'``.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import os
+import threading
+
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+
+from swagger_validator.adapters import Headers, RawResponse, WSGIRequest, is_json
+
+
+class BackgroundValidator(object):
+    """Validates responses on ``workers`` daemon threads.
+
+    ``submit`` never blocks: with ``maxsize`` responses already waiting the
+    response is dropped and counted in ``dropped``.  Responses submitted as
+    ``adapters.RawResponse`` are parsed on the worker thread.
+
+    The threads are started by the first ``submit`` of every process, so an
+    instance created before forking (e.g. by gunicorn ``--preload``) works
+    in the forked workers too.
+    """
+
+    def __init__(self, validator, report=None, maxsize=1000, workers=1):
+        self.validator = validator
+        self.report = report
+        self.maxsize = maxsize
+        self.workers = workers
+        self.queue = None
+        self.submitted = 0
+        self.dropped = 0
+        self.threads = []
+        # process the threads were started in
+        self.pid = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self.pid == os.getpid():
+                return
+            # threads do not survive fork(), responses queued for the
+            # parent's threads are never validated here
+            self.queue = queue.Queue(self.maxsize)
+            self.threads = []
+            for _ in range(self.workers):
+                thread = threading.Thread(target=self._work, args=(self.queue,), name='swagger-validator')
+                thread.daemon = True
+                thread.start()
+                self.threads.append(thread)
+            self.pid = os.getpid()
+
+    def submit(self, response):
+        if self.pid != os.getpid():
+            self._start()
+        try:
+            self.queue.put_nowait(response)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def join(self):
+        """Wait until every submitted response was validated."""
+        if self.pid == os.getpid():
+            self.queue.join()
+
+    def _work(self, pending):
+        while True:
+            response = pending.get()
+            try:
+                self.validate(response)
+            except Exception:
+                # a broken report hook must not kill the worker
+                pass
+            finally:
+                pending.task_done()
+
+    def validate(self, response):
+        errors = self.validator.validate_response(response)
+        if self.report is not None:
+            self.report('response', response, errors)
+
+
+class ValidationMiddleware(object):
+    """WSGI middleware validating requests inline and responses in the background.
+
+    JSON bodies larger than ``max_body_size`` are not validated, nor are
+    responses with a status outside of 2xx.
+    """
+
+    def __init__(self, app, validator, report=None, validate_requests=True, validate_responses=True,
+                 maxsize=1000, workers=1, max_body_size=1024 * 1024):
+        self.app = app
+        self.validator = validator
+        self.report = report
+        self.validate_requests = validate_requests
+        self.max_body_size = max_body_size
+        self.background = BackgroundValidator(validator, report, maxsize, workers) if validate_responses else None
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD'].upper()
+        path = environ.get('PATH_INFO', '')
+
+        if self.validate_requests:
+            request = self.build_request(environ)
+            if request is not None:
+                errors = self.validator.validate_request(request)
+                if self.report is not None:
+                    self.report('request', request, errors)
+
+        if self.background is None:
+            return self.app(environ, start_response)
+
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured['status'] = status
+            captured['headers'] = headers
+            if exc_info is not None:
+                return start_response(status, headers, exc_info)
+            return start_response(status, headers)
+
+        app_iter = self.app(environ, capture_start_response)
+        return ResponseCapture(app_iter, captured, method, path, self.background, self.max_body_size)
+
+    def build_request(self, environ):
+        """Return the lazy request of ``environ``, None if its body is too
+        large to be validated."""
+        request = WSGIRequest(environ)
+        length = request.content_length()
+        if length is not None and length > self.max_body_size:
+            return None
+        return request
+
+
+class ResponseCapture(object):
+    """Passes the application's response through, keeping a copy of 2xx JSON
+    bodies that is submitted for validation once the response is done."""
+
+    def __init__(self, app_iter, captured, method, path, background, max_body_size):
+        self.app_iter = app_iter
+        self.captured = captured
+        self.method = method
+        self.path = path
+        self.background = background
+        self.max_body_size = max_body_size
+        # copy of the body so far, None once it is known not to be validated
+        self.chunks = None
+
+    def __iter__(self):
+        size = 0
+        started = False
+        for chunk in self.app_iter:
+            if not started:
+                # start_response was called before the first chunk
+                started = True
+                self.chunks = [] if self._should_validate() else None
+            if self.chunks is not None:
+                size += len(chunk)
+                if size > self.max_body_size:
+                    self.chunks = None
+                else:
+                    self.chunks.append(chunk)
+            yield chunk
+
+        if not started and self._should_validate():
+            self.chunks = []
+        if self.chunks is not None:
+            self.background.submit(RawResponse(self.method, self.path, b''.join(self.chunks)))
+            self.chunks = None
+
+    def _should_validate(self):
+        status = self.captured.get('status', '')
+        if not status.startswith('2'):
+            return False
+        content_type = Headers(self.captured.get('headers', [])).get('content-type')
+        return is_json(content_type)
+
+    def close(self):
+        if hasattr(self.app_iter, 'close'):
+            self.app_iter.close()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Validate captured traffic against a spec.
+
+Usage: python -m swagger_validator spec.json traffic.jsonl [--jobs 8]
+
+Every JSON line holds ``method``, ``path`` and optionally ``query``,
+``headers``, ``body`` (the request body, whatever the name of the body
+parameter) and ``data`` (the response).  HAR files (``--har``) are
+converted to the same records, reading one entry at a time.  The records
+are validated in chunks by a pool of worker processes and the results are
+aggregated into counts per operation and error code, with a few sample
+records of every error.  Records that are not such objects are counted as
+``(unparsable)``.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import argparse
+import collections
+import io
+import itertools
+import json
+import multiprocessing
+import sys
+
+
+from swagger_validator import five
+from swagger_validator.core import SwaggerValidator
+from swagger_validator.stats import MISSING_OPERATION
+from swagger_validator.stream import JSONTokenizer, iter_array
+
+
+# operation name of records that could not be parsed
+UNPARSABLE = '(unparsable)'
+
+
+class Summary(object):
+    """Aggregated results; summaries of different chunks are combined with
+    ``update``."""
+
+    def __init__(self, max_samples=3):
+        self.max_samples = max_samples
+        self.records = 0
+        self.invalid = 0
+        # operation name -> [records, invalid records]
+        self.operations = {}
+        # (operation name, error code) -> count
+        self.errors = {}
+        # (operation name, error code) -> up to max_samples (record, errors)
+        self.samples = {}
+
+    def add(self, name, record, errors):
+        self.records += 1
+        counts = self.operations.get(name)
+        if counts is None:
+            counts = self.operations[name] = [0, 0]
+        counts[0] += 1
+        if not errors:
+            return
+
+        self.invalid += 1
+        counts[1] += 1
+        for code in set(error['code'] for error in errors):
+            key = (name, code)
+            self.errors[key] = self.errors.get(key, 0) + sum(1 for error in errors if error['code'] == code)
+            samples = self.samples.setdefault(key, [])
+            if len(samples) < self.max_samples:
+                samples.append((record, list(errors)))
+
+    def update(self, other):
+        self.records += other.records
+        self.invalid += other.invalid
+        for name, (records, invalid) in other.operations.items():
+            counts = self.operations.setdefault(name, [0, 0])
+            counts[0] += records
+            counts[1] += invalid
+        for key, count in other.errors.items():
+            self.errors[key] = self.errors.get(key, 0) + count
+        for key, samples in other.samples.items():
+            own = self.samples.setdefault(key, [])
+            own.extend(samples[:self.max_samples - len(own)])
+
+    def to_dict(self):
+        return {
+            'records': self.records,
+            'invalid': self.invalid,
+            'operations': dict(
+                (name, {'records': records, 'invalid': invalid})
+                for name, (records, invalid) in self.operations.items()
+            ),
+            'errors': [
+                {'operation': name, 'code': code, 'count': count, 'samples': [
+                    {'record': record, 'errors': errors} for record, errors in self.samples.get((name, code), [])
+                ]}
+                for (name, code), count in sorted(self.errors.items())
+            ],
+        }
+
+    def format(self):
+        lines = ['%d records, %d invalid' % (self.records, self.invalid), '']
+        for name, (records, invalid) in sorted(self.operations.items()):
+            lines.append('%-50s %10d records %10d invalid' % (name, records, invalid))
+            for (error_name, code), count in sorted(self.errors.items()):
+                if error_name != name:
+                    continue
+                lines.append('    %-46s %10d' % (code, count))
+                for record, errors in self.samples.get((name, code), []):
+                    lines.append('        %s' % json.dumps(record, sort_keys=True))
+        return '\n'.join(lines) + '\n'
+
+
+def read_jsonl(fileobj):
+    for line in fileobj:
+        if line.strip():
+            yield line
+
+
+def read_har(fileobj):
+    """Yield the records of the entries of a HAR document, which is not
+    loaded as a whole."""
+    try:
+        from urllib.parse import urlsplit
+    except ImportError:
+        from urlparse import urlsplit
+
+    for entry in iter_array(JSONTokenizer(fileobj), ('log', 'entries')):
+        request = entry['request']
+        record = {
+            'method': request['method'],
+            'path': urlsplit(request['url']).path,
+            'query': dict((item['name'], item['value']) for item in request.get('queryString', [])),
+            'headers': dict((item['name'], item['value']) for item in request.get('headers', [])),
+        }
+        body = _json_content(request.get('postData'))
+        if body is not None:
+            record['body'] = body[0]
+        data = _json_content(entry.get('response', {}).get('content'))
+        if data is not None:
+            record['data'] = data[0]
+        yield record
+
+
+def _json_content(content):
+    # (parsed JSON,) or None for missing or non JSON content
+    if not content or 'json' not in content.get('mimeType', '') or not content.get('text'):
+        return None
+    try:
+        return (json.loads(content['text']),)
+    except ValueError:
+        return None
+
+
+# the validator of a worker process, set by _init_worker
+_validator = None
+
+
+def _init_worker(validator):
+    global _validator
+    _validator = validator
+
+
+def record_problem(record):
+    """Return why ``record`` can not be validated, None if it can."""
+    if not isinstance(record, dict):
+        return 'expected an object'
+    for key in ('method', 'path'):
+        if not isinstance(record.get(key), five.string_types):
+            return 'expected a string %s' % key
+    for key in ('query', 'headers'):
+        if not isinstance(record.get(key, {}), dict):
+            return 'expected an object %s' % key
+    return None
+
+
+def _route(validator, method, path):
+    # (operation name or None for ignored endpoints, body parameter names)
+    operation, _ = validator.state.resolve(method, path)
+    if operation is False:
+        return None, ()
+    if operation is None:
+        return MISSING_OPERATION, ()
+    return operation.name, tuple(operation.parameters['body'])
+
+
+def _request(record, body_names):
+    # records carry the request body as 'body', validation looks it up by
+    # the name of the body parameter
+    if 'body' not in record or not body_names or body_names == ('body',):
+        return record
+    request = dict(record)
+    for name in body_names:
+        request.setdefault(name, record['body'])
+    return request
+
+
+def validate_chunk(chunk, max_samples=3, validator=None):
+    """Validate a list of records (dicts or JSON lines) into a Summary."""
+    validator = validator or _validator
+    summary = Summary(max_samples)
+    records = []
+    for record in chunk:
+        if not isinstance(record, dict):
+            try:
+                record = json.loads(record)
+            except ValueError:
+                summary.add(UNPARSABLE, record, [{'code': 'json_invalid'}])
+                continue
+        problem = record_problem(record)
+        if problem is not None:
+            summary.add(UNPARSABLE, record, [{'code': 'record_invalid', 'msg': problem}])
+            continue
+        records.append(record)
+
+    # (method, path) -> _route
+    routes = {}
+    names = []
+    requests = []
+    for record in records:
+        key = (record['method'].upper(), record['path'])
+        route = routes.get(key)
+        if route is None:
+            route = routes[key] = _route(validator, *key)
+        names.append(route[0])
+        requests.append(_request(record, route[1]))
+
+    requests = validator.validate_requests(requests)
+    responses = validator.validate_responses(records)
+    for record, name, request_errors, response_errors in zip(records, names, requests, responses):
+        if name is None:
+            continue
+        if name is MISSING_OPERATION:
+            # reported for the request already
+            response_errors = []
+        summary.add(name, record, request_errors + response_errors)
+    return summary
+
+
+def _validate_chunk(args):
+    return validate_chunk(*args)
+
+
+def replay(validator, records, jobs=None, chunk_size=1000, max_samples=3):
+    """Validate an iterable of records with ``jobs`` worker processes."""
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    summary = Summary(max_samples)
+
+    if jobs == 1:
+        for chunk in chunks:
+            summary.update(validate_chunk(chunk, max_samples, validator))
+        return summary
+
+    jobs = jobs or multiprocessing.cpu_count()
+    pool = multiprocessing.Pool(jobs, _init_worker, (validator,))
+    try:
+        # a bounded number of chunks in flight keeps memory flat, Pool.imap
+        # would read the whole input ahead
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(_validate_chunk, ((chunk, max_samples),)))
+            if len(pending) >= 2 * jobs:
+                summary.update(pending.popleft().get())
+        while pending:
+            summary.update(pending.popleft().get())
+    finally:
+        pool.terminate()
+    return summary
+
+
+def main(argv=None, output=sys.stdout):
+    parser = argparse.ArgumentParser(description='Validate captured traffic against a Swagger spec.')
+    parser.add_argument('spec', help='JSON spec file')
+    parser.add_argument('traffic', help='JSON lines file, "-" for stdin')
+    parser.add_argument('--har', action='store_true', help='traffic is a HAR file')
+    parser.add_argument('-j', '--jobs', type=int, help='number of worker processes, all CPUs by default')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='records sent to a worker at once')
+    parser.add_argument('--samples', type=int, default=3, help='sample records kept of every error')
+    parser.add_argument('--ignore', action='append', default=[], metavar='REGEXP', help='endpoint to ignore, may be repeated')
+    parser.add_argument('--artifact', help='prepared validator file, see swagger_validator.artifact')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    if args.artifact:
+        from swagger_validator.artifact import load_validator
+        validator = load_validator(args.spec, args.artifact, ignore_endpoints=args.ignore)
+    else:
+        with io.open(args.spec, encoding='utf-8') as fileobj:
+            validator = SwaggerValidator(json.load(fileobj), ignore_endpoints=args.ignore)
+
+    if args.traffic == '-':
+        fileobj = sys.stdin
+    else:
+        fileobj = io.open(args.traffic, encoding='utf-8')
+    try:
+        records = read_har(fileobj) if args.har else read_jsonl(fileobj)
+        summary = replay(validator, records, args.jobs, args.chunk_size, args.samples)
+    finally:
+        if fileobj is not sys.stdin:
+            fileobj.close()
+
+    if args.json:
+        output.write(json.dumps(summary.to_dict(), indent=2, sort_keys=True) + '\n')
+    else:
+        output.write(summary.format())
+    return 1 if summary.invalid else 0
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import random
+import timeit
+
+
+class SamplingPolicy(object):
+    """Decides which requests and responses get validated.
+
+    Pass an instance as ``SwaggerValidator(spec, sampling=...)``.  The
+    decision is made after the route lookup, so rates can be set per
+    operation (``rates`` maps operation names, see ``CompiledOperation.name``,
+    to a rate between 0 and 1, ``rate`` is used for all others).
+
+    Operations that produced errors in the last ``error_window`` seconds are
+    always validated.  With ``budget`` (seconds spent validating per second)
+    the rates are scaled down whenever validation took more time than that
+    and back up when it took less; the scale is adjusted once per second.
+
+    Shared between threads without a lock, racing updates only skew the
+    rates slightly.
+    """
+
+    # lower bound of the adaptive scale, so every operation keeps some coverage
+    MIN_SCALE = 0.001
+
+    def __init__(self, rate=1.0, rates=None, error_window=60.0, budget=None, clock=timeit.default_timer, random=random.random):
+        self.rate = rate
+        self.rates = dict(rates or {})
+        self.error_window = error_window
+        self.budget = budget
+        self.clock = clock
+        self.random = random
+        # multiplies all rates, adjusted to stay within the budget
+        self.scale = 1.0
+        # (kind, operation name) -> time of the last error
+        self.errors = {}
+        self._window_start = clock()
+        self._spent = 0.0
+
+    def should_validate(self, kind, name):
+        last_error = self.errors.get((kind, name))
+        if last_error is not None and self.clock() - last_error < self.error_window:
+            return True
+        rate = self.rates.get(name, self.rate) * self.scale
+        return rate >= 1.0 or self.random() < rate
+
+    def observe(self, kind, name, seconds, errors):
+        """Called after every validation the policy allowed."""
+        if errors:
+            self.errors[kind, name] = self.clock()
+
+        if self.budget is None:
+            return
+        self._spent += seconds
+        now = self.clock()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self._adapt(self._spent / elapsed)
+            self._window_start = now
+            self._spent = 0.0
+
+    def _adapt(self, load):
+        if load > self.budget:
+            self.scale = max(self.MIN_SCALE, self.scale * self.budget / load)
+        else:
+            # grow at most twofold per second, so a quiet second does not
+            # let the next burst through unsampled
+            growth = self.budget / load if load else 2.0
+            self.scale = min(1.0, self.scale * min(2.0, growth))
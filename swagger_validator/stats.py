@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import bisect
+import re
+import threading
+
+
+# upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+)
+
+# name used for requests and responses no operation was found for
+MISSING_OPERATION = '(missing)'
+
+
+class Histogram(object):
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # the last count is for values above the largest bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        # (upper bound or None for +Inf, number of values not above it)
+        total = 0
+        for bound, count in zip(self.buckets + (None,), self.counts):
+            total += count
+            yield bound, total
+
+
+class OperationStats(object):
+    def __init__(self, buckets):
+        self.calls = 0
+        # error code -> count
+        self.errors = {}
+        self.lookup = Histogram(buckets)
+        self.validation = Histogram(buckets)
+
+
+class ValidationStats(object):
+    """Collects per operation call counts, error counts by code and latency
+    histograms of route lookup and validation.
+
+    Pass an instance as ``SwaggerValidator(spec, stats=...)``; any object
+    with the same ``record`` method can be used instead.  Operations are
+    named by their nickname, or by method and path template.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # (kind, operation name) -> OperationStats, kind is 'request' or 'response'
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # counts belong to the process that recorded them
+        return {'buckets': self.buckets}
+
+    def __setstate__(self, state):
+        self.__init__(state['buckets'])
+
+    def record(self, kind, name, lookup_seconds, validation_seconds, errors):
+        with self._lock:
+            stats = self.operations.get((kind, name))
+            if stats is None:
+                stats = self.operations[kind, name] = OperationStats(self.buckets)
+            stats.calls += 1
+            stats.lookup.observe(lookup_seconds)
+            stats.validation.observe(validation_seconds)
+            for error in errors:
+                stats.errors[error['code']] = stats.errors.get(error['code'], 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}
+
+    def _snapshot(self, reset):
+        with self._lock:
+            operations = self.operations
+            if reset:
+                self.operations = {}
+            return sorted(operations.items())
+
+    def prometheus(self, prefix='swagger_validator'):
+        """Return the stats in the Prometheus text exposition format."""
+        operations = self._snapshot(False)
+        lines = []
+
+        lines.append('# TYPE %s_calls_total counter' % prefix)
+        for (kind, name), stats in operations:
+            lines.append('%s_calls_total{%s} %d' % (prefix, _labels(kind=kind, operation=name), stats.calls))
+
+        lines.append('# TYPE %s_errors_total counter' % prefix)
+        for (kind, name), stats in operations:
+            for code, count in sorted(stats.errors.items()):
+                lines.append('%s_errors_total{%s} %d' % (prefix, _labels(kind=kind, operation=name, code=code), count))
+
+        for metric in ('lookup', 'validation'):
+            lines.append('# TYPE %s_%s_seconds histogram' % (prefix, metric))
+            for (kind, name), stats in operations:
+                histogram = getattr(stats, metric)
+                for bound, count in histogram.cumulative():
+                    le = '+Inf' if bound is None else repr(bound)
+                    lines.append('%s_%s_seconds_bucket{%s} %d' % (prefix, metric, _labels(kind=kind, operation=name, le=le), count))
+                labels = _labels(kind=kind, operation=name)
+                lines.append('%s_%s_seconds_sum{%s} %r' % (prefix, metric, labels, histogram.sum))
+                lines.append('%s_%s_seconds_count{%s} %d' % (prefix, metric, labels, histogram.count))
+
+        return '\n'.join(lines) + '\n'
+
+    def statsd(self, prefix='swagger_validator', reset=True):
+        """Return StatsD lines: counters of calls and errors and the mean
+        lookup and validation times in milliseconds.
+
+        StatsD counters are deltas, so by default the stats are reset; send
+        the lines after every call.
+        """
+        lines = []
+        for (kind, name), stats in self._snapshot(reset):
+            key = '%s.%s.%s' % (prefix, kind, _statsd_name(name))
+            lines.append('%s.calls:%d|c' % (key, stats.calls))
+            for code, count in sorted(stats.errors.items()):
+                lines.append('%s.errors.%s:%d|c' % (key, _statsd_name(code), count))
+            for metric in ('lookup', 'validation'):
+                histogram = getattr(stats, metric)
+                if histogram.count:
+                    lines.append('%s.%s:%.6f|ms' % (key, metric, histogram.sum / histogram.count * 1000))
+        return lines
+
+
+def _labels(**labels):
+    return ','.join(
+        '%s="%s"' % (label, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for label, value in sorted(labels.items())
+    )
+
+
+def _statsd_name(name):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', name).strip('_') or '_'
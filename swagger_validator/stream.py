@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import codecs
+import re
+from json.decoder import scanstring
+
+
+from swagger_validator import five
+from swagger_validator.checkers import TypeChecker, ArrayChecker, ModelChecker, ModelReference
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+NUMBER_CHARS = re.compile(r'[-+0-9.eE]*')
+NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?$')
+LITERALS = (('true', True), ('false', False), ('null', None))
+
+
+class JSONTokenizer(object):
+    """Incremental JSON tokenizer reading ``fileobj`` in chunks.
+
+    ``next()`` returns ``(token, value)``, where token is one of ``{}[]:,``,
+    ``'value'`` for scalars (value is the decoded scalar) or ``'eof'``.
+    Only the current chunk and the current scalar are held in memory.
+    """
+
+    def __init__(self, fileobj, chunk_size=65536):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.decoder = None
+        self.buffer = ''
+        self.pos = 0
+
+    def _read(self, size=None):
+        chunk = self.fileobj.read(size or self.chunk_size)
+        if not chunk:
+            if self.decoder is not None:
+                # raises on a truncated UTF-8 sequence at the end
+                self.decoder.decode(b'', True)
+            return False
+        if isinstance(chunk, five.binary_type):
+            if self.decoder is None:
+                self.decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = self.decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next(self):
+        while True:
+            pos = WHITESPACE.match(self.buffer, self.pos).end()
+            self.pos = pos
+            if pos < len(self.buffer):
+                break
+            if not self._read():
+                return 'eof', None
+
+        char = self.buffer[pos]
+        if char in '{}[]:,':
+            self.pos = pos + 1
+            return char, None
+        elif char == '"':
+            return 'value', self._string()
+        elif char in '-0123456789':
+            return 'value', self._number()
+        else:
+            return 'value', self._literal()
+
+    def _string(self):
+        # the closing quote is searched for in newly read text only and reads
+        # grow geometrically, so long strings take linear time; scanstring
+        # decodes the string once it is buffered
+        search = self.pos + 1
+        size = self.chunk_size
+        while True:
+            quote = self._closing_quote(search)
+            if quote is not None:
+                break
+            search = len(self.buffer) - self.pos
+            if not self._read(size):
+                break
+            size *= 2
+
+        value, end = scanstring(self.buffer, self.pos + 1)
+        self.pos = end
+        return value
+
+    def _closing_quote(self, search):
+        # index of the first unescaped quote from search on, None if there
+        # is none buffered; the opening quote stops the backslash count
+        buffer = self.buffer
+        while True:
+            quote = buffer.find('"', search)
+            if quote == -1:
+                return None
+            start = quote
+            while buffer[start - 1] == '\\':
+                start -= 1
+            if (quote - start) % 2 == 0:
+                return quote
+            search = quote + 1
+
+    def _number(self):
+        # a number has no terminator, so make sure all of it is buffered
+        while True:
+            end = NUMBER_CHARS.match(self.buffer, self.pos).end()
+            if end == len(self.buffer) and self._read():
+                continue
+            break
+
+        text = self.buffer[self.pos:end]
+        match = NUMBER.match(text)
+        if match is None:
+            raise ValueError('invalid number %r' % text)
+
+        self.pos = end
+        if match.group(1) or match.group(2):
+            return float(text)
+        return int(text)
+
+    def _literal(self):
+        while len(self.buffer) - self.pos < 5 and self._read():
+            pass
+
+        for text, value in LITERALS:
+            if self.buffer.startswith(text, self.pos):
+                self.pos += len(text)
+                return value
+
+        raise ValueError('unexpected %r at %d' % (self.buffer[self.pos:self.pos + 10], self.pos))
+
+
+def _expect(tokens, expected):
+    token, value = tokens.next()
+    if token != expected:
+        raise ValueError('expected %r got %r' % (expected, token))
+
+
+def _object_keys(tokens):
+    # yields keys, the consumer has to read the value before resuming
+    token, key = tokens.next()
+    if token == '}':
+        return
+    while True:
+        if token != 'value' or not isinstance(key, five.string_types):
+            raise ValueError('expected object key got %r' % (key if token == 'value' else token))
+        _expect(tokens, ':')
+        yield key
+
+        token, value = tokens.next()
+        if token == '}':
+            return
+        if token != ',':
+            raise ValueError('expected , or } got %r' % token)
+        token, key = tokens.next()
+
+
+def _array_items(tokens):
+    # yields (token, value) starting each item, the consumer has to read the
+    # rest of the item before resuming
+    token, value = tokens.next()
+    if token == ']':
+        return
+    while True:
+        yield token, value
+
+        token, value = tokens.next()
+        if token == ']':
+            return
+        if token != ',':
+            raise ValueError('expected , or ] got %r' % token)
+        token, value = tokens.next()
+
+
+def skip_value(token, value, tokens):
+    if token == '{':
+        for key in _object_keys(tokens):
+            item_token, item_value = tokens.next()
+            skip_value(item_token, item_value, tokens)
+    elif token == '[':
+        for item_token, item_value in _array_items(tokens):
+            skip_value(item_token, item_value, tokens)
+    elif token != 'value':
+        raise ValueError('unexpected %r' % token)
+
+
+def read_value(token, value, tokens):
+    """Return the JSON value starting with ``(token, value)``, reading the
+    rest of it from ``tokens``."""
+    if token == '{':
+        result = {}
+        for key in _object_keys(tokens):
+            item_token, item_value = tokens.next()
+            result[key] = read_value(item_token, item_value, tokens)
+        return result
+    elif token == '[':
+        return [read_value(item_token, item_value, tokens) for item_token, item_value in _array_items(tokens)]
+    elif token != 'value':
+        raise ValueError('unexpected %r' % token)
+    return value
+
+
+def iter_array(tokens, keys):
+    """Yield the items of the array found under the object ``keys`` from the
+    root of the document, one at a time.
+
+    Other values are skipped, not kept; what follows the array is not read.
+    """
+    token, value = tokens.next()
+    for key in keys:
+        if token != '{':
+            raise ValueError('expected object with %r got %r' % (key, token))
+        for found in _object_keys(tokens):
+            token, value = tokens.next()
+            if found == key:
+                break
+            skip_value(token, value, tokens)
+        else:
+            raise ValueError('missing %r' % key)
+
+    if token != '[':
+        raise ValueError('expected array got %r' % token)
+    for item_token, item_value in _array_items(tokens):
+        yield read_value(item_token, item_value, tokens)
+
+
+def _describe(token, value):
+    if token == '{':
+        return 'object'
+    elif token == '[':
+        return 'array'
+    return repr(value)
+
+
+def validate_value(checker, token, value, tokens, path, sink):
+    """Validate the JSON value starting with ``(token, value)`` against a
+    compiled checker, reading the rest of it from ``tokens``.
+
+    Containers are never materialized, so memory is bounded by the nesting
+    depth.  Errors use the same paths as ``SwaggerValidator``, but come in
+    document order, and missing required properties are reported once the
+    enclosing object has been read.
+    """
+    if isinstance(checker, ModelReference):
+        model = checker.models.get(checker.model_name)
+        if model is None:
+            sink.add('model_missing', (path, checker.model_name))
+            skip_value(token, value, tokens)
+            return
+        checker = model
+
+    if isinstance(checker, ModelChecker):
+        if token != '{':
+            sink.add('type_invalid', path, 'expected %s got %s' % (checker.model_name, _describe(token, value)))
+            skip_value(token, value, tokens)
+            return
+
+        properties = checker.properties_by_name
+        seen = set()
+        for key in _object_keys(tokens):
+            seen.add(key)
+            item_token, item_value = tokens.next()
+            if key in properties:
+                segment, property_checker = properties[key]
+                validate_value(property_checker, item_token, item_value, tokens, (path, segment), sink)
+            else:
+                sink.add('property_undeclared', (path, (checker.model_name, key)))
+                skip_value(item_token, item_value, tokens)
+
+        for required_property, segment in checker.required:
+            if required_property not in seen:
+                sink.add('property_missing', (path, segment))
+
+    elif isinstance(checker, ArrayChecker):
+        if token != '[':
+            sink.add('type_invalid', path, 'expected %s got %s' % (checker.type_name, _describe(token, value)))
+            skip_value(token, value, tokens)
+            return
+
+        for item_index, (item_token, item_value) in enumerate(_array_items(tokens)):
+            if checker.items is None:
+                skip_value(item_token, item_value, tokens)
+            else:
+                validate_value(checker.items, item_token, item_value, tokens, (path, item_index), sink)
+
+    elif isinstance(checker, TypeChecker):
+        if token == 'value':
+            checker(value, path, sink)
+        else:
+            sink.add('type_invalid', path, 'expected %s got %s' % (checker.type_name, _describe(token, value)))
+            skip_value(token, value, tokens)
+
+    else:
+        raise TypeError('unsupported checker %r' % checker)
+
+
+def validate_stream(checker, fileobj, path, sink):
+    tokens = JSONTokenizer(fileobj)
+    token, value = tokens.next()
+    if token == 'eof':
+        raise ValueError('empty document')
+    validate_value(checker, token, value, tokens, path, sink)
+    token, value = tokens.next()
+    if token != 'eof':
+        raise ValueError('unexpected %r after document' % token)
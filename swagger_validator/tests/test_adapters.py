@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import types
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.adapters import ASGIRequest, EnvironHeaders, RawResponse, WSGIRequest
+from swagger_validator.cache import ResultCache
+from swagger_validator.codegen import generate
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+class UnreadableInput(object):
+    def read(self, *args):
+        raise AssertionError('body read')
+
+
+def environ(method, path, query='', body=b'', wsgi_input=None, **headers):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': wsgi_input or io.BytesIO(body),
+    }
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper()] = value
+    return environ
+
+
+def test_environ_headers():
+    headers = EnvironHeaders(environ('GET', '/', body=b'{}', x_version='2'))
+    assert headers['X-Version'] == headers['content-length'] == '2'
+    assert 'X-OTHER' not in headers
+    assert sorted(headers) == ['CONTENT-LENGTH', 'CONTENT-TYPE', 'X-VERSION']
+
+
+def test_wsgi_request():
+    validator = SwaggerValidator(SPECIFICATION)
+
+    request_environ = environ('PUT', '/note/1/', 'force=1', b'{"name": "Tom", "age": 90}', x_version='2')
+    request = WSGIRequest(request_environ)
+    assert 'body' in request and 'raw_body' not in request._values
+    assert [error['code'] for error in validator.validate_request(request)] == ['type_constraint']
+    # put back for the application
+    assert request_environ['wsgi.input'].read() == b'{"name": "Tom", "age": 90}'
+
+    # operations without a body parameter never read it
+    request = WSGIRequest(environ('GET', '/note/1/', body=b'{}', wsgi_input=UnreadableInput()))
+    assert validator.validate_request(request) == []
+    assert list(request._values) == ['method', 'path']
+
+
+def test_malformed_bodies():
+    validator = SwaggerValidator(SPECIFICATION)
+    generated = types.ModuleType('api_validators')
+    exec(compile(generate(SPECIFICATION), 'api_validators.py', 'exec'), generated.__dict__)
+
+    request = ASGIRequest({
+        'method': 'put',
+        'path': '/note/1/',
+        'query_string': b'force=1',
+        'headers': [(b'Content-Type', b'application/json'), (b'X-Version', b'1')],
+    }, b'{"name": ')
+    response = RawResponse('PUT', '/note/1/', b'{"name": ')
+    for module in (validator, generated):
+        assert [error['code'] for error in module.validate_request(request)] == ['json_invalid']
+        assert [error['code'] for error in module.validate_response(response)] == ['json_invalid']
+
+
+def test_cached_raw_responses():
+    parsed = []
+
+    class CountingResponse(RawResponse):
+        def get_body(self):
+            parsed.append(self['path'])
+            return super(CountingResponse, self).get_body()
+
+    validator = SwaggerValidator(SPECIFICATION, result_cache=ResultCache())
+    for _ in range(3):
+        response = CountingResponse('PUT', '/note/1/', b'{"name": "Bob", "age": 1}')
+        assert [error['code'] for error in validator.validate_response(response)] == ['type_constraint']
+    # hits are not parsed
+    assert parsed == ['/note/1/']
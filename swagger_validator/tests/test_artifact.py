@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+import pickle
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator, artifact
+from swagger_validator.cache import ResultCache
+from swagger_validator.stats import ValidationStats
+from swagger_validator.tests.test_swagger_validator import (
+    SPECIFICATION, VALIDATE_REQUEST_CASES, VALIDATE_RESPONSE_CASES,
+)
+
+
+IGNORE_ENDPOINTS = [r'/ignore/.*', r'/note/\d+/ignore']
+
+
+def test_pickle():
+    validator = SwaggerValidator(SPECIFICATION, ignore_endpoints=IGNORE_ENDPOINTS, route_cache_size=10)
+    validator.validate_request({'method': 'GET', 'path': '/note/1/'})
+
+    loaded = pickle.loads(pickle.dumps(validator, pickle.HIGHEST_PROTOCOL))
+
+    assert len(loaded.lookup.cache) == 0
+    assert loaded.lookup.cache.maxsize == 10
+    for request_, errors in VALIDATE_REQUEST_CASES:
+        assert loaded.validate_request(request_) == errors
+    for response_, errors in VALIDATE_RESPONSE_CASES:
+        assert loaded.validate_response(response_) == errors
+
+    assert loaded.merge({'apis': [{'operations': [{'method': 'GET'}], 'path': '/info/'}]}) == [
+        {'code': 'merge_apis_conflict', 'path': ['/info/']},
+    ]
+    assert loaded.merge({'apis': [{'operations': [{'method': 'GET'}], 'path': '/merged/'}]}) == []
+    assert loaded.validate_request({'method': 'GET', 'path': '/merged/'}) == []
+
+
+def test_dump_load():
+    validator = SwaggerValidator(SPECIFICATION)
+    key = artifact.artifact_key(b'{}')
+    fileobj = io.BytesIO()
+    artifact.dump(validator, fileobj, key)
+
+    fileobj.seek(0)
+    assert artifact.load(fileobj, key).validate_model('Pet', {'name': 1}) == [
+        {'code': 'type_invalid', 'path': ['Pet', 'name'], 'msg': 'expected string got 1'},
+    ]
+
+    fileobj.seek(0)
+    with pytest.raises(artifact.StaleArtifact):
+        artifact.load(fileobj, artifact.artifact_key(b'{ }'))
+
+
+def test_load_validator(tmpdir, monkeypatch):
+    spec_filename = str(tmpdir.join('spec.json'))
+    artifact_filename = str(tmpdir.join('spec.artifact'))
+    with io.open(spec_filename, 'wb') as fileobj:
+        fileobj.write(json.dumps(SPECIFICATION).encode('utf-8'))
+
+    built = []
+    original_init = SwaggerValidator.__init__
+
+    def counting_init(self, *args, **kwargs):
+        built.append(args)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(SwaggerValidator, '__init__', counting_init)
+
+    validator = artifact.load_validator(spec_filename, artifact_filename, ignore_endpoints=IGNORE_ENDPOINTS)
+    assert len(built) == 1
+    assert tmpdir.join('spec.artifact').check()
+
+    validator = artifact.load_validator(spec_filename, artifact_filename, ignore_endpoints=IGNORE_ENDPOINTS)
+    assert len(built) == 1
+    assert validator.validate_request({'method': 'GET', 'path': '/ignore/me'}) == []
+
+    # other options, other spec or other library version - rebuilt
+    artifact.load_validator(spec_filename, artifact_filename)
+    assert len(built) == 2
+    monkeypatch.setattr(artifact, '__version__', '0.0.0')
+    artifact.load_validator(spec_filename, artifact_filename)
+    assert len(built) == 3
+    artifact.load_validator(spec_filename, artifact_filename)
+    assert len(built) == 3
+
+
+def test_load_validator_runtime_options(tmpdir, monkeypatch):
+    spec_filename = str(tmpdir.join('spec.json'))
+    artifact_filename = str(tmpdir.join('spec.artifact'))
+    with io.open(spec_filename, 'wb') as fileobj:
+        fileobj.write(json.dumps(SPECIFICATION).encode('utf-8'))
+
+    stats = ValidationStats()
+    validator = artifact.load_validator(spec_filename, artifact_filename, stats=stats, result_cache=ResultCache())
+    assert validator.stats is stats
+    assert sorted(tmpdir.listdir()) == [tmpdir.join('spec.artifact'), tmpdir.join('spec.json')]
+
+    # runtime options do not invalidate the artifact and are not stored in it
+    monkeypatch.setattr(SwaggerValidator, '__init__', None)
+    validator = artifact.load_validator(spec_filename, artifact_filename, stats=ValidationStats())
+    assert validator.stats is not stats
+    assert validator.result_cache is None
+
+    # counts are not pickled along
+    stats.record('request', 'a', 0.1, 0.1, [])
+    assert pickle.loads(pickle.dumps(stats)).operations == {}
+
+
+def test_save_failure(tmpdir, monkeypatch):
+    def broken_dump(validator, fileobj, key):
+        fileobj.write(b'partial')
+        raise TypeError('cannot pickle')
+
+    monkeypatch.setattr(artifact, 'dump', broken_dump)
+    with pytest.raises(TypeError):
+        artifact.save(SwaggerValidator(SPECIFICATION), str(tmpdir.join('spec.artifact')), {})
+    assert tmpdir.listdir() == []
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import json
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.cache import ResultCache
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION, VALIDATE_MODEL_CASES
+
+
+@pytest.mark.parametrize(('doc', 'errors'), VALIDATE_MODEL_CASES)
+def test_cached_results(doc, errors):
+    validator = SwaggerValidator(SPECIFICATION, result_cache=ResultCache())
+    response = {'method': 'PUT', 'path': '/note/123/', 'data': doc}
+    expected = SwaggerValidator(SPECIFICATION).validate_response(response)
+
+    assert validator.validate_response(response) == expected
+    assert validator.validate_response(response) == expected
+    assert validator.validate_response(response, fail_fast=True) == expected[:1]
+    assert validator.is_valid_response(response) == (not expected)
+    assert validator.result_cache.info()['hits'] == 3
+    assert validator.result_cache.info()['misses'] == 1
+
+
+def test_raw_data():
+    cache = ResultCache()
+    validator = SwaggerValidator(SPECIFICATION, result_cache=cache)
+    raw_data = b'{"name": "Bob", "age": 30}'
+    response = {'method': 'PUT', 'path': '/note/1/', 'data': json.loads(raw_data.decode('utf-8')), 'raw_data': raw_data}
+    errors = validator.validate_response(response)
+    assert [error['code'] for error in errors] == ['type_constraint']
+
+    # the raw bytes alone identify the payload
+    response['data'] = {}
+    assert validator.validate_response(response) == errors
+    # other ids of the same operation hit, with their own paths
+    for note_id in range(2, 100):
+        response['path'] = '/note/%d/' % note_id
+        assert validator.validate_response(response) == [dict(errors[0], path=['PUT', response['path'], 'data', 'Person', 'name', 'enum'])]
+    assert len(cache) == 1
+    assert cache.info()['hits'] == 99
+
+
+def test_unserializable_data():
+    validator = SwaggerValidator(SPECIFICATION, result_cache=ResultCache())
+    response = {'method': 'GET', 'path': '/info/', 'data': object()}
+    assert [error['code'] for error in validator.validate_response(response)] == ['type_invalid']
+    assert len(validator.result_cache) == 0
+
+
+def test_non_json_data():
+    validator = SwaggerValidator(SPECIFICATION, result_cache=ResultCache())
+    response = {'method': 'PUT', 'path': '/note/1/', 'data': {'name': 'Tom', 'age': 30, 'hobbies': ['a']}}
+    assert validator.validate_response(response) == []
+    # the same JSON, but not a list
+    response['data']['hobbies'] = ('a',)
+    assert [error['code'] for error in validator.validate_response(response)] == ['type_invalid']
+    assert len(validator.result_cache) == 1
+
+    assert ResultCache.digest({'a': [1, 2.5, True, None, {'b': 'c'}]}) is not None
+    assert ResultCache.digest({1: 'a'}) is None
+    assert ResultCache.digest(['a', ('b',)]) is None
+
+
+def test_limits():
+    cache = ResultCache(maxsize=2, maxbytes=10000)
+    cache.set('a', ())
+    cache.set('b', ())
+    cache.get('a')
+    cache.set('c', ())
+    assert list(cache.data) == ['a', 'c']
+
+    cache.set('d', (('type_invalid', None, 'x' * 9000),))
+    assert list(cache.data) == ['c', 'd']
+    assert cache.size == 2 * cache.ENTRY_SIZE + cache.ERROR_SIZE + 9000
+
+
+def test_merge_clears_cache():
+    validator = SwaggerValidator(SPECIFICATION, result_cache=ResultCache())
+    validator.validate_response({'method': 'GET', 'path': '/info/', 'data': 'ok'})
+    assert len(validator.result_cache) == 1
+    validator.merge({'apis': [{'path': '/more/', 'operations': [{'method': 'GET'}]}]})
+    assert len(validator.result_cache) == 0
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import json
+import types
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.codegen import generate, main
+from swagger_validator.tests.test_swagger_validator import (
+    MIXED_PARAMETERS_CASES, MIXED_PARAMETERS_SPECIFICATION, SPECIFICATION, VALIDATE_MODEL_CASES, VALIDATE_REQUEST_CASES,
+    VALIDATE_RESPONSE_CASES,
+)
+
+
+IGNORE_ENDPOINTS = [r'/ignore/.*', r'/note/\d+/ignore']
+
+
+def load_module(source):
+    module = types.ModuleType('api_validators')
+    exec(compile(source, 'api_validators.py', 'exec'), module.__dict__)
+    return module
+
+
+@pytest.fixture(scope='module')
+def generated():
+    return load_module(generate(SPECIFICATION, IGNORE_ENDPOINTS))
+
+
+@pytest.mark.parametrize(('request_', 'errors'), VALIDATE_REQUEST_CASES)
+def test_validate_request(generated, request_, errors):
+    assert generated.validate_request(request_) == errors
+    assert generated.is_valid_request(request_) == (not errors)
+
+
+@pytest.mark.parametrize(('response_', 'errors'), VALIDATE_RESPONSE_CASES)
+def test_validate_response(generated, response_, errors):
+    assert generated.validate_response(response_) == errors
+    assert generated.is_valid_response(response_) == (not errors)
+
+
+@pytest.mark.parametrize(('doc', 'errors'), VALIDATE_MODEL_CASES)
+def test_validate_model(generated, doc, errors):
+    validator = SwaggerValidator(SPECIFICATION)
+    response = {'method': 'PUT', 'path': '/note/123/', 'data': doc}
+    expected = validator.validate_response(response)
+    assert generated.validate_response(response) == expected
+    assert generated.validate_response(response, fail_fast=True) == expected[:1]
+
+
+@pytest.mark.parametrize(('request_', 'errors'), MIXED_PARAMETERS_CASES)
+def test_validate_request_declaration_order(request_, errors):
+    generated = load_module(generate(MIXED_PARAMETERS_SPECIFICATION))
+    assert generated.validate_request(request_) == errors
+
+
+def test_generate_missing_model():
+    spec = {
+        'apis': [{'path': '/a/', 'operations': [{'method': 'GET', 'type': 'array', 'items': {'type': 'Missing'}}]}],
+        'models': {},
+    }
+    generated = load_module(generate(spec))
+    assert generated.validate_response({'method': 'GET', 'path': '/a/', 'data': [{}, 1]}) == [
+        {'code': 'model_missing', 'path': ['GET', '/a/', 'data', '0', 'Missing']},
+        {'code': 'model_missing', 'path': ['GET', '/a/', 'data', '1', 'Missing']},
+    ]
+
+
+def test_main(tmpdir):
+    spec_file = tmpdir.join('spec.json')
+    spec_file.write(json.dumps(SPECIFICATION))
+    output = tmpdir.join('api_validators.py')
+    main([str(spec_file), '-o', str(output), '--ignore', r'/ignore/.*'])
+
+    generated = load_module(output.read())
+    assert generated.validate_response({'method': 'GET', 'path': '/ignore/me/'}) == []
+    assert generated.validate_request({'method': 'PUT', 'path': '/note/1/', 'body': {'name': 'Tom', 'age': 1}}) == [
+        {'code': 'parameter_missing', 'path': ['PUT', '/note/1/', 'header', 'X-VERSION']},
+        {'code': 'parameter_missing', 'path': ['PUT', '/note/1/', 'query', 'force']},
+    ]
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+import os
+import signal
+import sys
+from wsgiref.util import setup_testing_defaults
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.adapters import RawResponse
+from swagger_validator.middleware import BackgroundValidator, Headers, ValidationMiddleware
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+class Reports(object):
+    def __init__(self):
+        self.reports = []
+
+    def __call__(self, kind, item, errors):
+        self.reports.append((kind, item['method'], item['path'], [error['code'] for error in errors]))
+
+
+def app(environ, start_response):
+    body = environ['wsgi.input'].read()
+    start_response('200 OK', [('Content-Type', 'application/json')])
+    return [b'{"name": "Tom", ', b'"age": %d}' % len(body)]
+
+
+def call(middleware, method, path, query='', headers=None, body=b'', content_length=None):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)) if content_length is None else content_length,
+        'wsgi.input': io.BytesIO(body),
+    }
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    setup_testing_defaults(environ)
+
+    statuses = []
+    app_iter = middleware(environ, lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        return statuses, b''.join(app_iter)
+    finally:
+        app_iter.close()
+
+
+def test_headers():
+    headers = Headers([('X-Version', '1')])
+    assert 'X-VERSION' in headers
+    assert headers['x-version'] == headers.get('X-VERSION') == '1'
+    assert headers.get('X-OTHER') is None
+
+
+def test_wsgi_middleware():
+    reports = Reports()
+    middleware = ValidationMiddleware(app, SwaggerValidator(SPECIFICATION), reports)
+
+    body = json.dumps({'name': 'Tom', 'age': 30}).encode('utf-8')
+    statuses, response_body = call(middleware, 'PUT', '/note/1/', 'force=1', {'X-Version': '2'}, body)
+    assert statuses == ['200 OK']
+    # the application still gets the whole body
+    assert response_body == b'{"name": "Tom", "age": 26}'
+
+    call(middleware, 'PUT', '/note/1/', 'force=x&hint=1', {}, b'{"name": ')
+    call(middleware, 'PUT', '/note/1/', 'force=x&hint=1', {}, b'{"name": "Tom", "age": 1}')
+    call(middleware, 'GET', '/info/')
+    middleware.background.join()
+
+    # responses are reported by the background thread, in order
+    assert sorted(reports.reports, key=lambda report: report[0]) == [
+        ('request', 'PUT', '/note/1/', []),
+        ('request', 'PUT', '/note/1/', ['json_invalid', 'parameter_missing', 'type_convert']),
+        ('request', 'PUT', '/note/1/', ['parameter_missing', 'type_convert']),
+        ('request', 'GET', '/info/', []),
+        ('response', 'PUT', '/note/1/', []),
+        ('response', 'PUT', '/note/1/', []),
+        ('response', 'PUT', '/note/1/', []),
+        ('response', 'GET', '/info/', ['type_invalid']),
+    ]
+
+
+def test_wsgi_middleware_malformed_content_length():
+    reports = Reports()
+    middleware = ValidationMiddleware(app, SwaggerValidator(SPECIFICATION), reports)
+
+    body = json.dumps({'name': 'Tom', 'age': 30}).encode('utf-8')
+    for content_length in ('abc', '-1'):
+        # the application runs all the same
+        statuses, response_body = call(middleware, 'PUT', '/note/1/', 'force=1', {'X-Version': '2'}, body, content_length)
+        assert statuses == ['200 OK']
+        assert response_body == b'{"name": "Tom", "age": 26}'
+    middleware.background.join()
+
+    assert [report for report in reports.reports if report[0] == 'request'] == [
+        ('request', 'PUT', '/note/1/', ['json_invalid']),
+        ('request', 'PUT', '/note/1/', ['json_invalid']),
+    ]
+
+
+def test_wsgi_middleware_captures_2xx_json_only():
+    def streaming_app(environ, start_response):
+        status, content_type = environ['PATH_INFO'].split('/')[2:4]
+        start_response(status, [('Content-Type', content_type.replace('-', '/'))])
+        for _ in range(3):
+            yield b'"ok"'
+
+    reports = Reports()
+    middleware = ValidationMiddleware(streaming_app, SwaggerValidator(SPECIFICATION), reports, validate_requests=False)
+    for status, content_type, captured in [
+        ('200', 'application-json', True),
+        ('404', 'application-json', False),
+        ('500', 'application-json', False),
+        ('200', 'application-octet-stream', False),
+    ]:
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/x/%s/%s/' % (status, content_type)}
+        capture = middleware(environ, lambda status, headers, exc_info=None: None)
+        for chunk in capture:
+            # decided by the first chunk already
+            assert (capture.chunks is not None) == captured
+    middleware.background.join()
+
+    assert [report[2] for report in reports.reports] == ['/x/200/application-json/']
+
+
+def test_background_validator_drops():
+    reports = Reports()
+    background = BackgroundValidator(SwaggerValidator(SPECIFICATION), reports, maxsize=1, workers=0)
+    assert background.submit(RawResponse('GET', '/info/', b'"ok"'))
+    assert not background.submit(RawResponse('GET', '/info/', b'"ok"'))
+    assert (background.submitted, background.dropped) == (1, 1)
+
+    background.validate(RawResponse('GET', '/info/', b'{'))
+    assert reports.reports == [('response', 'GET', '/info/', ['json_invalid'])]
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='os.fork')
+def test_background_validator_fork():
+    reports = Reports()
+    background = BackgroundValidator(SwaggerValidator(SPECIFICATION), reports, workers=2)
+    assert background.threads == []
+    background.submit(RawResponse('GET', '/info/', b'"ok"'))
+    background.join()
+    assert len(background.threads) == 2
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # child: the parent's threads are gone, fresh ones are started
+        try:
+            signal.alarm(10)
+            os.close(read_fd)
+            for _ in range(20):
+                background.submit(RawResponse('GET', '/info/', b'"ok"'))
+            background.join()
+            alive = sum(1 for thread in background.threads if thread.is_alive())
+            os.write(write_fd, json.dumps([len(reports.reports), alive, background.dropped]).encode('ascii'))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, 'rb') as fileobj:
+        result = fileobj.read()
+    os.waitpid(pid, 0)
+    # the report of the parent's response was inherited
+    assert json.loads(result.decode('ascii')) == [21, 2, 0]
+    assert len(reports.reports) == 1
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='asyncio.run')
+def test_asgi_middleware():
+    import asyncio
+    from swagger_validator.asgi import ValidationMiddleware as ASGIValidationMiddleware
+
+    async def asgi_app(scope, receive, send):
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body', 'body': b'{"name": "Bob", ', 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'"age": %d}' % len(body)})
+
+    reports = Reports()
+    middleware = ASGIValidationMiddleware(asgi_app, SwaggerValidator(SPECIFICATION), reports)
+
+    async def request(messages):
+        scope = {
+            'type': 'http',
+            'method': 'PUT',
+            'path': '/note/1/',
+            'query_string': b'force=1',
+            'headers': [(b'content-type', b'application/json'), (b'x-version', b'1')],
+        }
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+        await middleware(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(request([
+        {'type': 'http.request', 'body': b'{"name": "Tom", ', 'more_body': True},
+        {'type': 'http.request', 'body': b'"age": 300}'},
+    ]))
+    assert sent[-1]['body'] == b'"age": 27}'
+    middleware.background.join()
+
+    assert reports.reports == [
+        ('request', 'PUT', '/note/1/', ['type_constraint']),
+        ('response', 'PUT', '/note/1/', ['type_constraint']),
+    ]
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.replay import main, read_har, replay
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+RECORDS = [
+    {'method': 'PUT', 'path': '/note/1/', 'headers': {'X-VERSION': '1'}, 'query': {'force': '1'}, 'body': {'name': 'Tom', 'age': 1}},
+    {'method': 'PUT', 'path': '/note/2/', 'headers': {'X-VERSION': 'x'}, 'query': {'force': '1'}, 'body': {'name': 'Tom', 'age': 1}},
+    {'method': 'PUT', 'path': '/note/3/', 'body': {'name': 'Tom', 'age': 1}, 'data': {'name': 'Bob', 'age': 1}},
+    {'method': 'GET', 'path': '/info/', 'data': 'ok'},
+    {'method': 'GET', 'path': '/missing/'},
+    {'method': 'GET', 'path': '/ignore/me/'},
+]
+
+
+def expected_summary():
+    return {
+        'records': 5,
+        'invalid': 3,
+        'operations': {
+            '(missing)': {'records': 1, 'invalid': 1},
+            'info_get': {'records': 1, 'invalid': 0},
+            'note_put': {'records': 3, 'invalid': 2},
+        },
+        'errors': [
+            {'operation': '(missing)', 'code': 'operation_missing', 'count': 1, 'samples': [
+                {'record': RECORDS[4], 'errors': [{'code': 'operation_missing', 'path': ['GET', '/missing/']}]},
+            ]},
+            {'operation': 'note_put', 'code': 'parameter_missing', 'count': 2, 'samples': []},
+            {'operation': 'note_put', 'code': 'type_constraint', 'count': 1, 'samples': []},
+            {'operation': 'note_put', 'code': 'type_convert', 'count': 1, 'samples': []},
+        ],
+    }
+
+
+def strip_samples(summary):
+    for error in summary['errors']:
+        if error['operation'] == 'note_put':
+            error['samples'] = []
+    return summary
+
+
+@pytest.mark.parametrize(('jobs', 'chunk_size'), [(1, 1000), (1, 2), (2, 1)])
+def test_replay(jobs, chunk_size):
+    validator = SwaggerValidator(SPECIFICATION, ignore_endpoints=[r'/ignore/.*'])
+    summary = replay(validator, iter(RECORDS), jobs=jobs, chunk_size=chunk_size, max_samples=1)
+    assert strip_samples(summary.to_dict()) == expected_summary()
+    assert [len(samples) for samples in summary.samples.values()] == [1] * 4
+
+
+def test_read_har():
+    har = {'log': {'entries': [{
+        'request': {
+            'method': 'POST',
+            'url': 'http://example.com/notes/?a=1',
+            'queryString': [{'name': 'a', 'value': '1'}],
+            'headers': [{'name': 'X-VERSION', 'value': '2'}],
+            'postData': {'mimeType': 'application/json', 'text': '{"name": "Tom"}'},
+        },
+        'response': {'content': {'mimeType': 'text/html', 'text': '<html/>'}},
+    }]}}
+    assert list(read_har(io.StringIO(json.dumps(har)))) == [{
+        'method': 'POST',
+        'path': '/notes/',
+        'query': {'a': '1'},
+        'headers': {'X-VERSION': '2'},
+        'body': {'name': 'Tom'},
+    }]
+
+
+def test_read_har_streamed():
+    entry = {'request': {'method': 'GET', 'url': 'http://example.com/info/'}}
+    har = json.dumps({'version': '1.2', 'log': {'creator': {'name': 'x'}, 'pages': [{}], 'entries': [entry, entry]}})
+    # entries are yielded as they are read, a document cut short is fine
+    # up to the entry that is cut
+    truncated = har[:har.rindex('{"request"') + 10]
+    records = read_har(io.StringIO(truncated))
+    assert next(records) == {'method': 'GET', 'path': '/info/', 'query': {}, 'headers': {}}
+    with pytest.raises(ValueError):
+        next(records)
+
+    with pytest.raises(ValueError):
+        list(read_har(io.StringIO(u'{"log": {"pages": []}}')))
+
+
+def test_main(tmpdir):
+    spec = tmpdir.join('spec.json')
+    spec.write(json.dumps(SPECIFICATION))
+    traffic = tmpdir.join('traffic.jsonl')
+    traffic.write(''.join(json.dumps(record) + '\n' for record in RECORDS) + 'not json\n[1, 2]\n{"path": "/info/"}\n')
+
+    output = io.StringIO()
+    assert main([str(spec), str(traffic), '--jobs', '1', '--json', '--ignore', r'/ignore/.*'], output) == 1
+    result = json.loads(output.getvalue())
+    assert result['records'] == 8
+    assert result['operations']['(unparsable)'] == {'records': 3, 'invalid': 3}
+    assert [(error['code'], error['count']) for error in result['errors'] if error['operation'] == '(unparsable)'] == [
+        ('json_invalid', 1), ('record_invalid', 2),
+    ]
+
+    output = io.StringIO()
+    main([str(spec), str(traffic), '--jobs', '1', '--ignore', r'/ignore/.*'], output)
+    assert output.getvalue().startswith('8 records, 6 invalid\n')
+
+
+def test_body_parameter_name():
+    spec = {'apis': [{'path': '/pets/', 'operations': [{'method': 'POST', 'parameters': [
+        {'name': 'pet', 'paramType': 'body', 'type': 'string', 'required': True},
+    ]}]}]}
+    records = [
+        {'method': 'POST', 'path': '/pets/', 'body': 'Rex'},
+        {'method': 'POST', 'path': '/pets/', 'body': 1},
+    ]
+    summary = replay(SwaggerValidator(spec), iter(records), jobs=1)
+    assert summary.errors == {('POST /pets/', 'type_invalid'): 1}
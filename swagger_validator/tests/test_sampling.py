@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.sampling import SamplingPolicy
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+INVALID = {'method': 'GET', 'path': '/info/', 'data': 1}
+VALID = {'method': 'GET', 'path': '/info/', 'data': 'ok'}
+
+
+def test_rates():
+    policy = SamplingPolicy(rate=0.0, rates={'info_get': 1.0})
+    validator = SwaggerValidator(SPECIFICATION, sampling=policy)
+    assert validator.validate_response(INVALID) == [{'code': 'type_invalid', 'path': ['GET', '/info/', 'data'], 'msg': 'expected string got 1'}]
+    assert validator.validate_response({'method': 'GET', 'path': '/notes/', 'data': 1}) == []
+    # missing operations are always reported
+    assert validator.validate_response({'method': 'GET', 'path': '/missing/'}) == [{'code': 'operation_missing', 'path': ['GET', '/missing/']}]
+
+
+def test_recent_errors():
+    clock = Clock()
+    policy = SamplingPolicy(rate=0.5, error_window=10.0, clock=clock, random=lambda: 0.9)
+    validator = SwaggerValidator(SPECIFICATION, sampling=policy)
+    assert validator.validate_response(INVALID) == []
+
+    policy.random = lambda: 0.1
+    assert len(validator.validate_response(INVALID)) == 1
+    policy.random = lambda: 0.9
+    assert len(validator.validate_response(INVALID)) == 1
+    assert validator.validate_response(VALID) == []
+
+    clock.now = 10.0
+    assert validator.validate_response(INVALID) == []
+    assert policy.should_validate('request', 'info_get') is False
+
+
+def test_budget():
+    clock = Clock()
+    policy = SamplingPolicy(budget=0.1, clock=clock, random=lambda: 0.3)
+
+    clock.now = 1.0
+    policy.observe('response', 'a', 0.4, [])
+    assert policy.scale == 0.25
+    assert policy.should_validate('response', 'a') is False
+
+    clock.now = 2.0
+    policy.observe('response', 'a', 0.025, [])
+    assert policy.scale == 0.5
+
+    clock.now = 3.0
+    policy.observe('response', 'a', 0.0, [])
+    assert policy.scale == 1.0
+    assert policy.should_validate('response', 'a') is True
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.errors import ErrorAggregator, ValidationError
+from swagger_validator.stats import ValidationStats
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+def make_validator():
+    return SwaggerValidator(SPECIFICATION, ignore_endpoints=[r'/ignore/.*'], stats=ValidationStats(buckets=(0.001, 1.0)))
+
+
+def test_record():
+    validator = make_validator()
+    request = {'method': 'PUT', 'path': '/note/1/', 'body': {'name': 'Bob', 'age': 100}}
+    assert validator.validate_request(request) == SwaggerValidator(SPECIFICATION).validate_request(request)
+    validator.validate_request(request, fail_fast=True)
+    validator.validate_response({'method': 'GET', 'path': '/info/', 'data': 'ok'})
+    validator.validate_response({'method': 'GET', 'path': '/missing/'})
+    validator.validate_response({'method': 'GET', 'path': '/ignore/me/'})
+
+    operations = validator.stats.operations
+    assert sorted(operations) == [('request', 'note_put'), ('response', '(missing)'), ('response', 'info_get')]
+
+    stats = operations['request', 'note_put']
+    assert stats.calls == 2
+    assert stats.errors == {'parameter_missing': 2, 'type_constraint': 3}
+    assert stats.lookup.count == stats.validation.count == 2
+    assert sum(stats.validation.counts) == 2
+    assert operations['response', '(missing)'].errors == {'operation_missing': 1}
+
+
+def test_operation_name_without_nickname():
+    spec = {'apis': [{'path': '/a/{id}/', 'operations': [{'method': 'GET'}]}]}
+    validator = SwaggerValidator(spec, stats=ValidationStats())
+    validator.validate_response({'method': 'GET', 'path': '/a/1/', 'data': 'x'})
+    assert list(validator.stats.operations) == [('response', 'GET /a/{id}/')]
+
+
+def test_equal_operations_of_different_apis():
+    # equal operation dicts are interned into one object
+    spec = {'apis': [
+        {'path': '/a/{id}/', 'operations': [{'method': 'GET', 'type': 'string'}]},
+        {'path': '/b/{id}/', 'operations': [{'method': 'GET', 'type': 'string'}]},
+    ]}
+    validator = SwaggerValidator(spec, stats=ValidationStats())
+    validator.validate_response({'method': 'GET', 'path': '/a/1/', 'data': 'x'})
+    assert list(validator.stats.operations) == [('response', 'GET /a/{id}/')]
+
+    aggregator = ErrorAggregator()
+    validator.report_response({'method': 'GET', 'path': '/a/1/', 'data': 1}, aggregator)
+    assert [error['path'] for error in aggregator.report()] == [['GET', '/a/{id}/', 'data']]
+
+
+def test_prometheus():
+    stats = ValidationStats(buckets=(0.001, 0.01))
+    stats.record('request', 'a"b', 0.0005, 0.005, [ValidationError('type_invalid')])
+    stats.record('request', 'a"b', 0.0005, 0.05, [])
+    text = stats.prometheus()
+
+    assert 'swagger_validator_calls_total{kind="request",operation="a\\"b"} 2\n' in text
+    assert 'swagger_validator_errors_total{code="type_invalid",kind="request",operation="a\\"b"} 1\n' in text
+    assert 'swagger_validator_validation_seconds_bucket{kind="request",le="0.001",operation="a\\"b"} 0\n' in text
+    assert 'swagger_validator_validation_seconds_bucket{kind="request",le="0.01",operation="a\\"b"} 1\n' in text
+    assert 'swagger_validator_validation_seconds_bucket{kind="request",le="+Inf",operation="a\\"b"} 2\n' in text
+    assert 'swagger_validator_lookup_seconds_count{kind="request",operation="a\\"b"} 2\n' in text
+
+
+def test_statsd():
+    stats = ValidationStats()
+    stats.record('response', 'GET /a/{id}/', 0.001, 0.003, [ValidationError('type_invalid'), ValidationError('type_invalid')])
+    assert stats.statsd(prefix='api') == [
+        'api.response.GET_a_id.calls:1|c',
+        'api.response.GET_a_id.errors.type_invalid:2|c',
+        'api.response.GET_a_id.lookup:1.000000|ms',
+        'api.response.GET_a_id.validation:3.000000|ms',
+    ]
+    assert stats.statsd() == []
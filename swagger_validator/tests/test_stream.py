@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import io
+import json
+
+
+import pytest
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.stream import JSONTokenizer, iter_array
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION, VALIDATE_MODEL_CASES
+
+
+class ChunkedReader(object):
+    def __init__(self, data, size):
+        self.data = io.BytesIO(data)
+        self.size = size
+        self.reads = 0
+
+    def read(self, size):
+        self.reads += 1
+        return self.data.read(min(size, self.size))
+
+
+def tokenize(data, size):
+    tokenizer = JSONTokenizer(ChunkedReader(data, size))
+    tokens = []
+    while True:
+        token = tokenizer.next()
+        tokens.append(token)
+        if token[0] == 'eof':
+            return tokens
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 65536])
+def test_tokenizer(size):
+    data = u' {"a\\u0105": [1, -2.5e3, true, false, null], "b": "x\\"y", "żó": {}} '.encode('utf-8')
+    assert tokenize(data, size) == [
+        ('{', None),
+        ('value', u'aą'), (':', None),
+        ('[', None),
+        ('value', 1), (',', None),
+        ('value', -2500.0), (',', None),
+        ('value', True), (',', None),
+        ('value', False), (',', None),
+        ('value', None),
+        (']', None), (',', None),
+        ('value', u'b'), (':', None), ('value', u'x"y'), (',', None),
+        ('value', u'żó'), (':', None), ('{', None), ('}', None),
+        ('}', None),
+        ('eof', None),
+    ]
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 65536])
+def test_tokenizer_escapes(size):
+    strings = [u'\\', u'"', u'a\\"b\\\\' * 5, u'\\"' * 3 + u'ą']
+    assert tokenize(json.dumps(strings).encode('utf-8'), size)[1:-2:2] == [('value', string) for string in strings]
+
+
+def test_tokenizer_long_string():
+    string = u'x\\"' * 300000
+    reader = ChunkedReader(json.dumps([string, 1]).encode('utf-8'), 2 ** 30)
+    tokenizer = JSONTokenizer(reader, chunk_size=1024)
+    assert [tokenizer.next() for _ in range(5)] == [('[', None), ('value', string), (',', None), ('value', 1), (']', None)]
+    # reads grow, the string is not rescanned after every chunk
+    assert reader.reads < 20
+
+
+def test_iter_array():
+    items = [{'a': [1, {'b': None}], 'c': u'ą'}, [], 2.5]
+    data = json.dumps({'skipped': [{'x': [1]}, 'y'], 'log': {'other': {}, 'entries': items}, 'z': 1}).encode('utf-8')
+    assert list(iter_array(JSONTokenizer(ChunkedReader(data, 3)), ('log', 'entries'))) == items
+
+
+@pytest.mark.parametrize(('doc', 'errors'), VALIDATE_MODEL_CASES)
+def test_validate_response_stream(doc, errors):
+    validator = SwaggerValidator(SPECIFICATION)
+    response = {'method': 'PUT', 'path': '/note/123/', 'data': doc}
+    data = json.dumps(doc).encode('utf-8')
+
+    expected = validator.validate_response(response)
+    for size in (1, 5, 65536):
+        streamed = validator.validate_response_stream('put', '/note/123/', ChunkedReader(data, size))
+        # stream reports errors in document order
+        assert sorted(streamed, key=repr) == sorted(expected, key=repr)
+
+
+STREAM_CASES = [
+    (b'[]', [{'code': 'type_invalid', 'path': ['PUT', '/note/123/', 'data']}]),
+    (b'{"name": "Tom", "age": 30, "pets": {}}', [
+        {'code': 'type_invalid', 'path': ['PUT', '/note/123/', 'data', 'Person', 'pets']},
+    ]),
+    (b'{"name": "Tom", "age": 30, "hobbies": [{"a": [1, 2]}, "x"]}', [
+        {'code': 'type_invalid', 'path': ['PUT', '/note/123/', 'data', 'Person', 'hobbies', '0']},
+    ]),
+    (b'{"name": "Tom", "age": 30', [
+        {'code': 'json_invalid', 'path': ['PUT', '/note/123/', 'data']},
+    ]),
+    (b'{"name": "Tom", "age": 30} 1', [
+        {'code': 'json_invalid', 'path': ['PUT', '/note/123/', 'data']},
+    ]),
+    # truncated UTF-8 sequence
+    (b'{"name": "Tom", "age": 30} \xc5', [
+        {'code': 'json_invalid', 'path': ['PUT', '/note/123/', 'data']},
+    ]),
+]
+
+
+@pytest.mark.parametrize(('data', 'errors'), STREAM_CASES)
+def test_validate_response_stream_errors(data, errors):
+    validator = SwaggerValidator(SPECIFICATION)
+    streamed = validator.validate_response_stream('PUT', '/note/123/', io.BytesIO(data))
+    assert [{'code': error['code'], 'path': error['path']} for error in streamed] == errors
+
+
+def test_validate_response_stream_fail_fast():
+    validator = SwaggerValidator(SPECIFICATION)
+    data = b'{"name": "Tom", "age": 30, "hobbies": [1, 2, 3'
+    assert validator.validate_response_stream('PUT', '/note/123/', io.BytesIO(data), fail_fast=True) == [
+        {'code': 'type_invalid', 'path': ['PUT', '/note/123/', 'data', 'Person', 'hobbies', '0'], 'msg': 'expected string got 1'},
+    ]
+    assert validator.validate_response_stream('GET', '/missing/', io.BytesIO(data)) == [
+        {'code': 'operation_missing', 'path': ['GET', '/missing/']},
+    ]
@@ -4,13 +4,19 @@ from __future__ import with_statement, division, absolute_import, print_function
 
 
 import copy
+import json
+import re
+import threading
 
 
 import pytest
 
 
 from swagger_validator import SwaggerValidator
-from swagger_validator.core import OperationLookup
+from swagger_validator.core import OperationLookup, prepend_path
+from swagger_validator.checkers import ArrayChecker
+from swagger_validator.errors import ErrorAggregator, ValidationError
+from swagger_validator.fingerprint import Interner
 
 
 SPECIFICATION = {
@@ -150,6 +156,50 @@ def format_errors(errors):
     ]
 
 
+def test_validation_error():
+    error = ValidationError('type_invalid', (((None, ('GET', '/x/', 'data')), 3), ('Pet', 'name')), 'expected string')
+    assert error == {'code': 'type_invalid', 'path': ['GET', '/x/', 'data', '3', 'Pet', 'name'], 'msg': 'expected string'}
+    assert isinstance(error, dict)
+    assert json.loads(json.dumps(error)) == error
+    error['severity'] = 'warning'
+    assert sorted(error) == ['code', 'msg', 'path', 'severity']
+
+    error = ValidationError('type_invalid', msg='expected string')
+    assert error == {'code': 'type_invalid', 'msg': 'expected string'}
+    assert 'path' not in error
+
+    assert prepend_path([error], ['body']) == [{'code': 'type_invalid', 'path': ['body'], 'msg': 'expected string'}]
+
+    errors = SwaggerValidator(SPECIFICATION).validate_response({'method': 'PUT', 'path': '/note/1/', 'data': {}})
+    assert json.loads(json.dumps(errors)) == errors
+
+
+def test_error_aggregator():
+    validator = SwaggerValidator(SPECIFICATION)
+    aggregator = ErrorAggregator(max_samples=2)
+    for note_id in range(5):
+        validator.report_response({
+            'method': 'PUT',
+            'path': '/note/%d/' % note_id,
+            'data': {'name': 'Tom', 'age': note_id, 'foo': 1, 'hobbies': ['a', note_id, note_id]},
+        }, aggregator)
+    validator.report_request({'method': 'GET', 'path': '/missing/'}, aggregator)
+
+    assert aggregator.report() == [
+        {'code': 'type_invalid', 'path': ['PUT', '/note/{note_id}/', 'data', 'Person', 'hobbies', '*'], 'count': 10, 'samples': [
+            'expected string got 0', 'expected string got 0',
+        ]},
+        {'code': 'property_undeclared', 'path': ['PUT', '/note/{note_id}/', 'data', 'Person', 'foo'], 'count': 5, 'samples': []},
+        {'code': 'operation_missing', 'path': ['GET', '/missing/'], 'count': 1, 'samples': []},
+    ]
+
+    aggregator = ErrorAggregator(max_keys=1)
+    validator.report_request({'method': 'GET', 'path': '/missing/1/'}, aggregator)
+    validator.report_request({'method': 'GET', 'path': '/missing/2/'}, aggregator)
+    assert len(aggregator.report()) == 1
+    assert aggregator.dropped == 1
+
+
 MERGE_CASES = [
     ({}, []),
 
@@ -242,6 +292,100 @@ def test_merge_api():
     assert validator.validate_request(request) == []
 
 
+def test_merge_copy_on_write():
+    spec = copy.deepcopy(SPECIFICATION)
+    validator = SwaggerValidator(spec, ignore_endpoints=[r'/ignore/.*'])
+    old_state = validator.state
+    person = validator.models['Person']
+
+    validator.merge({
+        'apis': [
+            {'operations': [{'method': 'GET', 'nickname': 'note_extra_get'}], 'path': '/note/{note_id}/extra/'},
+        ],
+        'models': {'Tag': {'id': 'Tag', 'properties': {'name': {'type': 'string'}}}},
+    })
+
+    # the previous snapshot and the caller's spec are left untouched
+    assert spec == SPECIFICATION
+    assert old_state.lookup.get('GET', '/note/1/extra/') == (None, None)
+    assert 'Tag' not in old_state.models
+
+    assert validator.lookup.get('GET', '/note/1/extra/')[0]['nickname'] == 'note_extra_get'
+    assert validator.lookup.get('GET', '/note/1/')[0]['nickname'] == 'note_get'
+    assert validator.lookup.get('GET', '/ignore/me') == (False, None)
+    assert validator.models['Person'] is person
+    assert validator.validate_model('Tag', {'name': 1}) == [
+        {'code': 'type_invalid', 'path': ['Tag', 'name'], 'msg': 'expected string got 1'},
+    ]
+
+
+def test_interner():
+    interner = Interner()
+    digest, value = interner.intern({'a': [1, {'b': 'x'}], 'c': 2.0})
+    assert interner.intern({'c': 2, 'a': [1, {'b': 'x'}]}) == (digest, value)
+    assert interner.intern({'c': 2, 'a': [1, {'b': 'y'}]})[0] != digest
+    assert interner.intern(value)[1] is value
+
+
+def test_merge_shares_equal_subtrees():
+    validator = SwaggerValidator(copy.deepcopy(SPECIFICATION))
+    pet = validator.spec['models']['Pet']
+    assert pet['properties']['name'] is pet['properties']['species']
+
+    other = copy.deepcopy(SPECIFICATION)
+    other['models']['Owner'] = {'id': 'Owner', 'properties': {'pet': {'type': 'Pet'}, 'name': {'type': 'string'}}}
+    assert validator.merge(other) == []
+
+    owner = validator.spec['models']['Owner']
+    assert owner['properties']['name'] is pet['properties']['name']
+    assert validator.spec['models']['Pet'] is pet
+    assert len(validator.spec['apis']) == len(SPECIFICATION['apis'])
+
+    other['models']['Pet']['properties']['name']['type'] = 'integer'
+    other['apis'][0]['operations'][0]['nickname'] = 'changed'
+    assert validator.merge(other) == [
+        {'code': 'merge_apis_conflict', 'path': ['/notes/']},
+        {'code': 'merge_model_conflict', 'path': ['Pet']},
+    ]
+
+
+def test_merge_missing_model():
+    spec = copy.deepcopy(SPECIFICATION)
+    spec['models']['Person']['properties']['tags'] = {'type': 'array', 'items': {'type': 'Tag'}}
+    validator = SwaggerValidator(spec)
+    doc = {'name': 'Tom', 'age': 30, 'tags': [{'name': 1}]}
+
+    assert format_errors(validator.validate_model('Person', doc)) == [
+        {'code': 'model_missing', 'path': ['Person', 'tags', '0', 'Tag']},
+    ]
+    validator.merge({'models': {'Tag': {'id': 'Tag', 'properties': {'name': {'type': 'string'}}}}})
+    assert format_errors(validator.validate_model('Person', doc)) == [
+        {'code': 'type_invalid', 'path': ['Person', 'tags', '0', 'Tag', 'name']},
+    ]
+
+
+def test_merge_concurrent():
+    validator = SwaggerValidator(copy.deepcopy(SPECIFICATION))
+    request = {'method': 'GET', 'path': '/note/1/'}
+    failures = []
+
+    def validate():
+        for i in range(200):
+            if validator.validate_request(request) != []:
+                failures.append(i)
+
+    threads = [threading.Thread(target=validate) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(50):
+        validator.merge({'apis': [{'operations': [{'method': 'GET'}], 'path': '/merged/%d/' % i}]})
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    assert validator.validate_request({'method': 'GET', 'path': '/merged/49/'}) == []
+
+
 VALIDATE_MODEL_CASES = [
     ({'name': 'Tom', 'age': 30}, []),
 
@@ -272,6 +416,12 @@ VALIDATE_MODEL_CASES = [
     ({'name': 'Tom', 'age': 30, 'pets': [{'species': 8472, 'name': 'Purr'}]}, [
         {'code': 'type_invalid', 'path': ['Person', 'pets', '0', 'Pet', 'species']}
     ]),
+    ({'name': 'Tom', 'age': 30, 'pets': [None, 1, 'cat', []]}, [
+        {'code': 'type_invalid', 'path': ['Person', 'pets', '0']},
+        {'code': 'type_invalid', 'path': ['Person', 'pets', '1']},
+        {'code': 'type_invalid', 'path': ['Person', 'pets', '2']},
+        {'code': 'type_invalid', 'path': ['Person', 'pets', '3']},
+    ]),
 ]
 
 
@@ -281,6 +431,16 @@ def test_validate_model(doc, errors):
     assert format_errors(validator.validate_model('Person', doc)) == errors
 
 
+def test_validation_messages():
+    validator = SwaggerValidator(SPECIFICATION)
+    assert [error['msg'] for error in validator.validate_model('Person', {'name': 'Tom', 'age': 90, 'pets': [7]})] == [
+        'expected not more than 80 got 90', 'expected Pet got 7',
+    ]
+    assert validator.validate_type({'type': 'number', 'minimum': 0.5}, 0) == [
+        {'code': 'type_constraint', 'path': ['minimum'], 'msg': 'expected not less than 0.5 got 0'},
+    ]
+
+
 def test_validate_missing_model():
     doc = {'name': 'Tom', 'age': 30}
     errors = [{'code': 'model_missing', 'path': ['User']}]
@@ -314,6 +474,11 @@ VALIDATE_TYPE_CASES = [
         100,
         [{'code': 'type_constraint', 'path': ['maximum']}],
     ),
+    (
+        {"type": "number", "minimum": 0.5},
+        0.25,
+        [{'code': 'type_constraint', 'path': ['minimum']}],
+    ),
     (
         {"type": "string", "enum": ["cat", "dog"]},
         "cat",
@@ -381,6 +546,22 @@ def test_validate_type(spec, value, errors):
     assert format_errors(validator.validate_type(spec, value)) == errors
 
 
+def test_compile():
+    validator = SwaggerValidator(copy.deepcopy(SPECIFICATION))
+    assert set(validator.models) == set(['Person', 'Pet'])
+    assert validator.models['Person'].declared == frozenset(['name', 'age', 'hobbies', 'pets'])
+
+    # compiled checkers do not look at the spec dicts any more
+    validator.spec['models']['Person']['required'] = []
+    assert format_errors(validator.validate_model('Person', {})) == [
+        {'code': 'property_missing', 'path': ['Person', 'name']},
+        {'code': 'property_missing', 'path': ['Person', 'age']},
+    ]
+
+    validator.compile()
+    assert validator.validate_model('Person', {}) == []
+
+
 VALIDATE_TYPE_OR_MODEL_CASES = [
     (
         {"type": "integer", "minimum": 0, "maximum": 80},
@@ -442,18 +623,122 @@ OPERATION_LOOKUP_CASES = [
     ('method', 'path', 'nickname', 'params'),
     OPERATION_LOOKUP_CASES
 )
-def test_operation_lookup(method, path, nickname, params):
+@pytest.mark.parametrize('cache_size', [None, 2])
+def test_operation_lookup(method, path, nickname, params, cache_size):
     lookup = OperationLookup(
         SPECIFICATION['apis'],
         ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
+        cache_size=cache_size,
     )
-    operation, path_params = lookup.get(method, path)
-    if operation is False:
-        assert nickname is False
-    elif operation is None:
-        assert nickname is None
+    for i in range(2):
+        operation, path_params = lookup.get(method, path)
+        if operation is False:
+            assert nickname is False
+        elif operation is None:
+            assert nickname is None
+        else:
+            assert operation.get('nickname') == nickname
+            assert path_params == params
+
+
+IGNORE_CASES = [
+    ([], '/static/a.css', False),
+    ([r'/static/', r'/health$'], '/static/a.css', True),
+    ([r'/static/', r'/health$'], '/health', True),
+    ([r'/static/', r'/health$'], '/health/x', False),
+    ([r'/(a|b)/(\d+)/\2$', r'/static/'], '/a/1/1', True),
+    ([r'/(a|b)/(\d+)/\2$', r'/static/'], '/a/1/2', False),
+    ([r'/static/', r'(?i)/admin'], '/ADMIN', True),
+    ([r'/static/', r'(?i)/admin'], '/STATIC/x', False),
+    ([r'/static/', r'(?i)/admin', r'/health$'], '/HEALTH', False),
+    ([re.compile(r'/admin', re.I), r'/static/'], '/ADMIN', True),
+    ([re.compile(r'/admin', re.I), r'/static/'], '/static/x', True),
+    ([re.compile(r'/admin', re.I), r'/static/'], '/note/1/', False),
+]
+
+
+@pytest.mark.parametrize(('ignore_endpoints', 'path', 'ignored'), IGNORE_CASES)
+def test_operation_lookup_ignore(ignore_endpoints, path, ignored):
+    lookup = OperationLookup(SPECIFICATION['apis'], ignore_endpoints=ignore_endpoints)
+    assert (lookup.get('GET', path)[0] is False) == ignored
+
+
+def test_operation_lookup_ignore_joined():
+    lookup = OperationLookup([], ignore_endpoints=[r'/static/', r'/health$', r'/(a)/\1', r'(?i)/admin', re.compile('/x')])
+    assert [matcher.pattern for matcher in lookup.ignore_endpoints] == [
+        r'(?:/static/)|(?:/health$)', r'/(a)/\1', r'(?i)/admin', '/x',
+    ]
+
+
+def test_operation_lookup_cache():
+    lookup = OperationLookup(SPECIFICATION['apis'], cache_size=2)
+
+    operation, path_params = lookup.get('GET', '/note/1/')
+    path_params['note_id'] = 'changed'
+    assert lookup.get('GET', '/note/1/') == (operation, {'note_id': '1'})
+    assert lookup.cache.info() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 2}
+
+    lookup.get('GET', '/note/2/')
+    lookup.get('GET', '/note/1/')
+    lookup.get('GET', '/note/3/')
+    assert ('GET', '/note/1/') in lookup.cache
+    assert ('GET', '/note/2/') not in lookup.cache
+    assert lookup.cache.info() == {'hits': 2, 'misses': 3, 'size': 2, 'maxsize': 2}
+
+
+def test_merge_clears_route_cache():
+    validator = SwaggerValidator(copy.deepcopy(SPECIFICATION), route_cache_size=10)
+    request = {'method': 'GET', 'path': '/merge/test/'}
+
+    assert validator.validate_request(request) == [{'code': 'operation_missing', 'path': ['GET', '/merge/test/']}]
+    assert len(validator.lookup.cache) == 1
+    validator.merge({
+        "apis": [
+            {"operations": [{"method": "GET", "nickname": "merge_test_get"}], "path": "/merge/test/"},
+        ],
+    })
+    assert len(validator.lookup.cache) == 0
+    assert validator.lookup.cache.maxsize == 10
+    assert validator.validate_request(request) == []
+
+
+ROUTING_APIS = [
+    {"path": "/items/{item_id}/", "operations": [{"method": "GET", "nickname": "item_get"}]},
+    {"path": "/items/special/", "operations": [
+        {"method": "GET", "nickname": "special_get"},
+        {"method": "POST", "nickname": "special_post"},
+    ]},
+    {"path": "/files/{name}.{ext}", "operations": [{"method": "GET", "nickname": "file_get"}]},
+    {"path": "/files/{path}", "operations": [{"method": "GET", "nickname": "files_get"}]},
+    {"path": "/a/{x}/b/", "operations": [{"method": "GET", "nickname": "ab_get"}]},
+    {"path": "/a/{y}/c/", "operations": [{"method": "GET", "nickname": "ac_get"}]},
+]
+
+
+ROUTING_CASES = [
+    # earlier declaration wins, as with a linear scan
+    ('GET', '/items/special/', 'item_get', {'item_id': 'special'}),
+    ('POST', '/items/special/', 'special_post', {}),
+    ('GET', '/items/7/', 'item_get', {'item_id': '7'}),
+
+    ('GET', '/files/notes.txt', 'file_get', {'name': 'notes', 'ext': 'txt'}),
+    ('GET', '/files/notes', 'files_get', {'path': 'notes'}),
+    ('GET', '/files/a/b', None, None),
+
+    ('GET', '/a/1/b/', 'ab_get', {'x': '1'}),
+    ('GET', '/a/1/c/', 'ac_get', {'y': '1'}),
+    ('GET', '/a/1/d/', None, None),
+    ('PUT', '/a/1/b/', None, None),
+]
+
+
+@pytest.mark.parametrize(('method', 'path', 'nickname', 'params'), ROUTING_CASES)
+def test_operation_lookup_routing(method, path, nickname, params):
+    operation, path_params = OperationLookup(ROUTING_APIS).get(method, path)
+    if nickname is None:
+        assert (operation, path_params) == (None, None)
     else:
-        assert operation.get('nickname') == nickname
+        assert operation['nickname'] == nickname
         assert path_params == params
 
 
@@ -513,9 +798,62 @@ VALIDATE_REQUEST_CASES = [
         },
         []
     ),
+
+    (
+        {
+            'method': 'PUT',
+            'path': '/note/abc/',
+            'body': {"name": "Alice", "age": 25},
+            'headers': {
+                'X-VERSION': '123',
+            },
+            'query': {
+                "force": "1",
+            },
+        },
+        [
+            {'code': 'type_convert', 'path': ['PUT', '/note/abc/', 'path', 'note_id']},
+        ]
+    ),
 ]
 
 
+def test_typed_path_parameters():
+    spec = {
+        'apis': [
+            {
+                'operations': [
+                    {
+                        'method': 'GET',
+                        'nickname': 'price_get',
+                        'parameters': [
+                            {'name': 'kind', 'paramType': 'path', 'type': 'string', 'enum': ['net', 'gross']},
+                            {'name': 'amount', 'paramType': 'path', 'type': 'number'},
+                        ],
+                    },
+                    # the same route with untyped parameters
+                    {'method': 'DELETE', 'nickname': 'price_delete'},
+                ],
+                'path': '/price/{kind}/{amount}',
+            },
+        ],
+        'models': {},
+    }
+    lookup = OperationLookup(spec['apis'], cache_size=10)
+    for _ in range(2):
+        operation, params = lookup.get('GET', '/price/net/-1.5e3')
+        assert (operation['nickname'], params, params.invalid) == ('price_get', {'kind': 'net', 'amount': '-1.5e3'}, frozenset())
+        operation, params = lookup.get('GET', '/price/tax/1x')
+        assert (operation['nickname'], params.invalid) == ('price_get', frozenset(['kind', 'amount']))
+    assert lookup.get('DELETE', '/price/tax/1x')[1].invalid == frozenset()
+
+    validator = SwaggerValidator(spec)
+    assert validator.validate_request({'method': 'GET', 'path': '/price/gross/.5'}) == []
+    assert validator.validate_request({'method': 'GET', 'path': '/price/tax/5'}) == [
+        {'code': 'type_convert', 'path': ['GET', '/price/tax/5', 'path', 'kind']},
+    ]
+
+
 # for some reason pytest treats 'request' in a special way, which breaks test
 @pytest.mark.parametrize(('request_', 'errors'), VALIDATE_REQUEST_CASES)
 def test_validate_request(request_, errors):
@@ -524,6 +862,37 @@ def test_validate_request(request_, errors):
         ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
     )
     assert validator.validate_request(request_) == errors
+    assert validator.validate_and_coerce_request(request_)[0] == errors
+
+
+def test_validate_and_coerce_request():
+    validator = SwaggerValidator(SPECIFICATION)
+    request = {
+        'method': 'PUT',
+        'path': '/note/123/',
+        'body': {"name": "Alice", "age": 25},
+        'headers': {'X-VERSION': '2'},
+        'query': {'force': '1', 'hint': 'x'},
+    }
+    assert validator.validate_and_coerce_request(request) == (
+        [{'code': 'type_convert', 'path': ['PUT', '/note/123/', 'query', 'hint']}],
+        {'path': {'note_id': 123}, 'query': {'force': 1}, 'header': {'X-VERSION': 2}},
+    )
+
+    request['path'] = '/note/abc/'
+    errors, coerced = validator.validate_and_coerce_request(request)
+    assert errors[0] == {'code': 'type_convert', 'path': ['PUT', '/note/abc/', 'path', 'note_id']}
+    assert coerced['path'] == {}
+
+    assert validator.validate_and_coerce_request({'method': 'GET', 'path': '/info/'}) == ([], {'path': {}, 'query': {}, 'header': {}})
+
+    spec = {'apis': [{'path': '/a/{id}/{flag}', 'operations': [{'method': 'GET', 'parameters': [
+        {'name': 'id', 'paramType': 'path', 'type': 'integer', 'minimum': 10},
+        {'name': 'flag', 'paramType': 'path', 'type': 'boolean'},
+    ]}]}]}
+    validator = SwaggerValidator(spec)
+    request = {'method': 'GET', 'path': '/a/1/true'}
+    assert validator.validate_and_coerce_request(request) == (validator.validate_request(request), {'path': {'id': 1}, 'query': {}, 'header': {}})
 
 
 VALIDATE_RESPONSE_CASES = [
@@ -555,3 +924,192 @@ def test_validate_response(response_, errors):
         ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
     )
     assert validator.validate_response(response_) == errors
+
+
+def test_validate_max_errors():
+    validator = SwaggerValidator(SPECIFICATION)
+    response = {
+        'method': 'PUT',
+        'path': '/note/123/',
+        'data': {'name': 'Tom', 'age': 30, 'hobbies': [1, 2, 3, 4]},
+    }
+    hobby_errors = [
+        {'code': 'type_invalid', 'path': ['PUT', '/note/123/', 'data', 'Person', 'hobbies', str(i)]}
+        for i in range(4)
+    ]
+
+    assert format_errors(validator.validate_response(response)) == hobby_errors
+    assert validator.validate_response(response, max_errors=0) == []
+    assert format_errors(validator.validate_response(response, max_errors=2)) == hobby_errors[:2]
+    assert format_errors(validator.validate_response(response, max_errors=10)) == hobby_errors
+    assert format_errors(validator.validate_response(response, fail_fast=True)) == hobby_errors[:1]
+
+    request = {'method': 'PUT', 'path': '/note/123/', 'query': {'foo': 'bar'}}
+    assert validator.validate_request(request, fail_fast=True) == [
+        {'code': 'parameter_undeclared', 'path': ['PUT', '/note/123/', 'query', 'foo']},
+    ]
+
+
+@pytest.mark.parametrize(('request_', 'errors'), VALIDATE_REQUEST_CASES)
+def test_is_valid_request(request_, errors):
+    validator = SwaggerValidator(
+        SPECIFICATION,
+        ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
+    )
+    assert validator.is_valid_request(request_) == (not errors)
+
+
+@pytest.mark.parametrize(('response_', 'errors'), VALIDATE_RESPONSE_CASES)
+def test_is_valid_response(response_, errors):
+    validator = SwaggerValidator(
+        SPECIFICATION,
+        ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
+    )
+    assert validator.is_valid_response(response_) == (not errors)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 1000])
+def test_validate_requests(chunk_size):
+    validator = SwaggerValidator(
+        SPECIFICATION,
+        ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
+    )
+    requests = [request_ for request_, errors in VALIDATE_REQUEST_CASES] * 3
+    expected = [errors for request_, errors in VALIDATE_REQUEST_CASES] * 3
+
+    results = validator.validate_requests(iter(requests), chunk_size=chunk_size)
+    assert not isinstance(results, list)
+    assert list(results) == expected
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 1000])
+def test_validate_responses(chunk_size):
+    validator = SwaggerValidator(
+        SPECIFICATION,
+        ignore_endpoints=[r'/ignore/.*', r'/note/\d+/ignore'],
+    )
+    responses = [response_ for response_, errors in VALIDATE_RESPONSE_CASES] * 3
+    expected = [errors for response_, errors in VALIDATE_RESPONSE_CASES] * 3
+
+    assert list(validator.validate_responses(responses, chunk_size=chunk_size)) == expected
+    assert list(validator.validate_responses(responses, fail_fast=True)) == [errors[:1] for errors in expected]
+
+
+BULK_ARRAY_CASES = [
+    ({"type": "integer", "minimum": 0, "maximum": 80}, list(range(100))),
+    ({"type": "integer", "minimum": 0, "maximum": 80}, list(range(-10, 90)) + [True, 2 ** 60, 1.5]),
+    ({"type": "integer", "minimum": 0}, [2 ** 60] * 70 + [-2 ** 60]),
+    ({"type": "number", "maximum": 1.5}, [0.5, 1, 2.5, float('nan')] * 20),
+    ({"type": "number"}, [0.5, 1] * 40),
+    ({"type": "number", "maximum": 2 ** 53}, [2 ** 53 + 1] * 100),
+    ({"type": "string", "enum": ["cat", "dog"]}, ["cat", "dog", "fish"] * 30),
+    ({"type": "string"}, ["cat", 1] * 40),
+    ({"type": "boolean"}, [True, False, 0] * 30),
+]
+
+
+@pytest.mark.parametrize(('items', 'value'), BULK_ARRAY_CASES)
+def test_validate_array_bulk(monkeypatch, items, value):
+    validator = SwaggerValidator(SPECIFICATION)
+    spec = {"type": "array", "items": items}
+
+    bulk = validator.validate_type(spec, value)
+    monkeypatch.setattr(ArrayChecker, 'BULK_MIN_LENGTH', len(value) + 1)
+    assert validator.validate_type(spec, value) == bulk
+
+
+def test_compiled_operation():
+    validator = SwaggerValidator(SPECIFICATION)
+    compiled = validator.operations['/note/{note_id}/', 'PUT']
+
+    assert compiled.declared == {
+        'body': frozenset(['body']),
+        'header': frozenset(['X-VERSION']),
+        'path': frozenset(['note_id']),
+        'query': frozenset(['force', 'hint']),
+    }
+    assert compiled.required == {
+        'body': ('body',),
+        'header': ('X-VERSION',),
+        'path': ('note_id',),
+        'query': ('force',),
+    }
+    assert compiled.parameters['query']['hint'].type_name == 'integer'
+
+
+MIXED_PARAMETERS_SPECIFICATION = {
+    'apis': [{
+        'path': '/items/{item_id}/',
+        'operations': [{
+            'method': 'POST',
+            'parameters': [
+                {'name': 'q', 'paramType': 'query', 'type': 'integer', 'required': True},
+                {'name': 'X-A', 'paramType': 'header', 'type': 'integer', 'required': True},
+                {'name': 'payload', 'paramType': 'body', 'type': 'integer', 'required': True},
+                {'name': 'other_id', 'paramType': 'path', 'type': 'string', 'required': True},
+                {'name': 'item_id', 'paramType': 'path', 'type': 'string', 'required': True},
+                {'name': 'r', 'paramType': 'query', 'type': 'integer'},
+            ],
+        }],
+    }],
+    'models': {},
+}
+
+# errors follow the declaration order of the parameters, whatever their kind
+MIXED_PARAMETERS_CASES = [
+    (
+        {'method': 'POST', 'path': '/items/1/', 'query': {'r': 'y', 'q': 'x', 's': '1'}},
+        [
+            {'code': 'parameter_undeclared', 'path': ['POST', '/items/1/', 'query', 's']},
+            {'code': 'type_convert', 'path': ['POST', '/items/1/', 'query', 'q']},
+            {'code': 'parameter_missing', 'path': ['POST', '/items/1/', 'header', 'X-A']},
+            {'code': 'parameter_missing', 'path': ['POST', '/items/1/', 'body']},
+            {'code': 'parameter_missing', 'path': ['POST', '/items/1/', 'path', 'other_id']},
+            {'code': 'type_convert', 'path': ['POST', '/items/1/', 'query', 'r']},
+        ],
+    ),
+    (
+        {'method': 'POST', 'path': '/items/1/', 'headers': {'X-A': 'x'}, 'payload': 'p'},
+        [
+            {'code': 'parameter_missing', 'path': ['POST', '/items/1/', 'query', 'q']},
+            {'code': 'type_convert', 'path': ['POST', '/items/1/', 'header', 'X-A']},
+            {'code': 'type_invalid', 'path': ['POST', '/items/1/', 'body'], 'msg': "expected integer got 'p'"},
+            {'code': 'parameter_missing', 'path': ['POST', '/items/1/', 'path', 'other_id']},
+        ],
+    ),
+]
+
+
+@pytest.mark.parametrize(('request_', 'errors'), MIXED_PARAMETERS_CASES)
+def test_validate_request_declaration_order(request_, errors):
+    validator = SwaggerValidator(MIXED_PARAMETERS_SPECIFICATION)
+    assert validator.validate_request(request_) == errors
+
+
+def test_validate_request_many_query_parameters():
+    spec = {
+        'apis': [{
+            'path': '/search/',
+            'operations': [{
+                'method': 'GET',
+                'parameters': [
+                    {'name': 'p%d' % i, 'paramType': 'query', 'type': 'integer', 'required': i < 2}
+                    for i in range(40)
+                ],
+            }],
+        }],
+        'models': {},
+    }
+    validator = SwaggerValidator(spec)
+
+    assert validator.validate_request({'method': 'GET', 'path': '/search/', 'query': {'p0': '1', 'p1': '2', 'p30': '3'}}) == []
+    assert validator.validate_request({'method': 'GET', 'path': '/search/', 'query': {'p0': 'x', 'p99': '1'}}) == [
+        {'code': 'parameter_undeclared', 'path': ['GET', '/search/', 'query', 'p99']},
+        {'code': 'type_convert', 'path': ['GET', '/search/', 'query', 'p0']},
+        {'code': 'parameter_missing', 'path': ['GET', '/search/', 'query', 'p1']},
+    ]
+    # errors follow the declaration order of the parameters
+    query = dict(('p%d' % i, 'x') for i in (39, 2, 17, 0, 25, 1))
+    assert [error['path'][-1] for error in validator.validate_request({'method': 'GET', 'path': '/search/', 'query': query})] == [
+        'p0', 'p1', 'p2', 'p17', 'p25', 'p39',
+    ]
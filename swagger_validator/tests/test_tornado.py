@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+
+import pytest
+
+
+tornado = pytest.importorskip('tornado')
+
+
+from tornado.testing import AsyncHTTPTestCase
+from tornado.web import Application, RequestHandler
+
+
+from swagger_validator import SwaggerValidator
+from swagger_validator.adapters import QueryArguments
+from swagger_validator.tornado import ValidationMixin
+from swagger_validator.tests.test_swagger_validator import SPECIFICATION
+
+
+REPORTS = []
+BUFFERED = []
+
+
+class NoteHandler(ValidationMixin, RequestHandler):
+    def report_validation(self, kind, item, errors):
+        REPORTS.append((kind, item['method'], item['path'], [error['code'] for error in errors]))
+
+    def put(self, note_id):
+        self.finish({'name': 'Tom', 'age': int(note_id)})
+
+    def get(self, note_id):
+        if note_id == '3':
+            # not JSON, never buffered
+            self.write(b'x' * 100)
+            self.flush()
+            self.write(b'y')
+            BUFFERED.append(self._response_chunks)
+            return
+        self.set_header('Content-Type', 'application/json')
+        if note_id == '4':
+            self.write(b'"' + b'x' * self.max_body_size + b'"')
+            BUFFERED.append(self._response_chunks)
+            return
+        self.write(b'"a note"')
+
+
+def test_query_arguments():
+    query = QueryArguments({'a': [b'1', b'2'], 'b': [b'\xc5\xbc']})
+    assert dict(query) == {'a': '2', 'b': u'ż'}
+    assert 'a' in query and 'c' not in query
+
+
+class TestValidationMixin(AsyncHTTPTestCase):
+    def get_app(self):
+        self.executor = ThreadPoolExecutor(1)
+        NoteHandler.validation_executor = self.executor
+        return Application([(r'/note/(\d+)/', NoteHandler)], swagger_validator=SwaggerValidator(SPECIFICATION))
+
+    def test_validation(self):
+        del REPORTS[:]
+        del BUFFERED[:]
+        body = json.dumps({'name': 'Tom', 'age': 30})
+        headers = {'Content-Type': 'application/json', 'X-Version': '1'}
+        self.fetch('/note/300/?force=1', method='PUT', body=body, headers=headers)
+        self.fetch('/note/1/?force=x', method='PUT', body='{', headers={'Content-Type': 'application/json'})
+        self.fetch('/note/2/')
+        self.fetch('/note/3/')
+        self.fetch('/note/4/')
+        self.executor.shutdown(wait=True)
+
+        assert sorted(REPORTS) == sorted([
+            ('request', 'PUT', '/note/300/', []),
+            ('response', 'PUT', '/note/300/', ['type_constraint']),
+            ('request', 'PUT', '/note/1/', ['json_invalid', 'parameter_missing', 'type_convert']),
+            ('response', 'PUT', '/note/1/', []),
+            ('request', 'GET', '/note/2/', []),
+            ('response', 'GET', '/note/2/', []),
+            ('request', 'GET', '/note/3/', []),
+            ('request', 'GET', '/note/4/', []),
+        ])
+        assert BUFFERED == [None, None]
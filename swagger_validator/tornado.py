@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Tornado integration (Tornado 5+).
+
+Mix ``ValidationMixin`` into request handlers::
+
+    class NoteHandler(ValidationMixin, tornado.web.RequestHandler):
+        ...
+
+    application = tornado.web.Application(handlers, swagger_validator=SwaggerValidator(spec))
+
+Requests and the JSON responses written by handlers are validated on an
+executor, so neither parsing nor validating large bodies blocks the IOLoop.
+"""
+from __future__ import with_statement, division, absolute_import, print_function
+
+
+import logging
+
+
+from tornado.ioloop import IOLoop
+
+
+from swagger_validator.adapters import RawResponse, TornadoRequest, is_json
+
+
+log = logging.getLogger('swagger_validator')
+
+
+class ValidationMixin(object):
+    """``RequestHandler`` mixin validating requests and 2xx JSON responses.
+
+    The validator is ``swagger_validator`` of the handler or of the
+    application settings.  Validation runs on ``validation_executor`` (the
+    IOLoop's default executor if None), results go to
+    ``report_validation``, called on the executor thread.
+
+    Only 2xx responses are kept for validation, written either as a dict or
+    after setting a JSON ``Content-Type``, and only up to ``max_body_size``
+    bytes.
+    """
+
+    swagger_validator = None
+    validation_executor = None
+    validate_requests = True
+    validate_responses = True
+    # larger JSON responses are not validated
+    max_body_size = 1024 * 1024
+
+    def get_swagger_validator(self):
+        return self.swagger_validator or self.settings.get('swagger_validator')
+
+    def report_validation(self, kind, item, errors):
+        """Called with the result of every validation; must not touch the
+        handler, it runs on the executor thread."""
+        if errors:
+            log.warning('invalid %s %s %s: %r', kind, item['method'], item['path'], errors)
+
+    def prepare(self):
+        self._response_data = None
+        # None once the response is known not to be validated
+        self._response_chunks = [] if self.validate_responses else None
+        self._response_size = 0
+        validator = self.get_swagger_validator()
+        if validator is not None and self.validate_requests:
+            self._run_validation(self._validate_request, validator, self.request)
+        return super(ValidationMixin, self).prepare()
+
+    def write(self, chunk):
+        if getattr(self, '_response_chunks', None) is not None:
+            if not 200 <= self.get_status() < 300:
+                self._response_chunks = None
+            elif isinstance(chunk, dict):
+                # serialized by tornado, keep the value itself
+                self._response_data = chunk
+                self._response_chunks = None
+            elif not is_json(self._headers.get('Content-Type')):
+                self._response_chunks = None
+            else:
+                data = chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+                self._response_size += len(data)
+                if self._response_size > self.max_body_size:
+                    self._response_chunks = None
+                else:
+                    self._response_chunks.append(data)
+        return super(ValidationMixin, self).write(chunk)
+
+    def finish(self, chunk=None):
+        result = super(ValidationMixin, self).finish(chunk)
+
+        validator = self.get_swagger_validator()
+        if validator is not None and self.validate_responses and 200 <= self.get_status() < 300:
+            method = self.request.method.upper()
+            if getattr(self, '_response_data', None) is not None:
+                response = {'method': method, 'path': self.request.path, 'data': self._response_data}
+            elif getattr(self, '_response_chunks', None) and is_json(self._headers.get('Content-Type')):
+                response = RawResponse(method, self.request.path, b''.join(self._response_chunks))
+            else:
+                return result
+            self._run_validation(self._validate_response, validator, response)
+        return result
+
+    def _run_validation(self, function, *args):
+        future = IOLoop.current().run_in_executor(self.validation_executor, function, *args)
+        future.add_done_callback(_log_failure)
+
+    def _validate_request(self, validator, request):
+        item = TornadoRequest(request)
+        self.report_validation('request', item, validator.validate_request(item))
+
+    def _validate_response(self, validator, response):
+        self.report_validation('response', response, validator.validate_response(response))
+
+
+def _log_failure(future):
+    try:
+        future.result()
+    except Exception:
+        log.exception('validation failed')